@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+from typing import Any, Iterator
+import importlib.util
+import io
+import json
+import os
+import shutil
+import struct
+import subprocess
+import wave
+
+np = None
+if importlib.util.find_spec("numpy") is not None:
+    import numpy as np  # type: ignore
+
+SAMPLE_RATE = 16000
+PIPER_QUALITY_RATES = {"x_low": 16000, "low": 16000, "medium": 22050, "high": 22050}
+
+
+def decode_audio(data: bytes, sample_rate: int = SAMPLE_RATE) -> Any:
+    if data[:4] == b"RIFF" and data[8:12] == b"WAVE":
+        try:
+            return _decode_wav(data, sample_rate)
+        except (wave.Error, ValueError, EOFError):
+            pass
+    return _decode_ffmpeg(data, sample_rate)
+
+
+def resample(audio: Any, rate: int, target_rate: int = SAMPLE_RATE) -> Any:
+    if rate == target_rate or not len(audio):
+        return audio.astype(np.float32, copy=False)
+    duration = len(audio) / rate
+    target_times = np.arange(int(duration * target_rate)) / target_rate
+    source_times = np.arange(len(audio)) / rate
+    return np.interp(target_times, source_times, audio).astype(np.float32)
+
+
+def encode_wav(pcm: bytes, sample_rate: int, channels: int = 1, sample_width: int = 2) -> bytes:
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as writer:
+        writer.setnchannels(channels)
+        writer.setsampwidth(sample_width)
+        writer.setframerate(sample_rate)
+        writer.writeframes(pcm)
+    return buffer.getvalue()
+
+
+def wav_stream_header(sample_rate: int, channels: int = 1, sample_width: int = 2) -> bytes:
+    byte_rate = sample_rate * channels * sample_width
+    return (
+        b"RIFF"
+        + struct.pack("<I", 0xFFFFFFFF)
+        + b"WAVEfmt "
+        + struct.pack("<IHHIIHH", 16, 1, channels, sample_rate, byte_rate, channels * sample_width, sample_width * 8)
+        + b"data"
+        + struct.pack("<I", 0xFFFFFFFF)
+    )
+
+
+def piper_command(voice: str) -> list[str]:
+    return ["piper", "--model", voice, "--output-raw"]
+
+
+def piper_sample_rate(voice: str) -> int:
+    for config_path in (f"{voice}.json", f"{voice}.onnx.json"):
+        if os.path.exists(config_path):
+            with open(config_path, "r", encoding="utf-8") as handle:
+                return int(json.load(handle).get("audio", {}).get("sample_rate", 22050))
+    quality = os.path.basename(voice).removesuffix(".onnx").rsplit("-", 1)[-1]
+    return PIPER_QUALITY_RATES.get(quality, 22050)
+
+
+def synthesize_wav(text: str, voice: str) -> bytes:
+    process = subprocess.run(piper_command(voice), input=text.encode("utf-8"), capture_output=True, check=False)
+    if process.returncode != 0:
+        raise RuntimeError("piper failed to synthesize audio")
+    return encode_wav(process.stdout, piper_sample_rate(voice))
+
+
+def stream_piper_cli(text: str, voice: str, chunk_size: int = 4096) -> Iterator[bytes]:
+    process = subprocess.Popen(piper_command(voice), stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+    try:
+        assert process.stdin is not None and process.stdout is not None
+        process.stdin.write(text.encode("utf-8"))
+        process.stdin.close()
+        while True:
+            chunk = process.stdout.read1(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        if process.poll() is None:
+            process.kill()
+        process.wait()
+
+
+def _decode_wav(data: bytes, sample_rate: int) -> Any:
+    with wave.open(io.BytesIO(data), "rb") as reader:
+        if reader.getsampwidth() != 2:
+            raise ValueError("only 16-bit PCM is decoded natively")
+        channels = reader.getnchannels()
+        rate = reader.getframerate()
+        frames = reader.readframes(reader.getnframes())
+    audio = np.frombuffer(frames, dtype="<i2").astype(np.float32) / 32768.0
+    if channels > 1:
+        audio = audio.reshape(-1, channels).mean(axis=1)
+    return resample(audio, rate, sample_rate)
+
+
+def _decode_ffmpeg(data: bytes, sample_rate: int) -> Any:
+    if not shutil.which("ffmpeg"):
+        raise RuntimeError("ffmpeg is required to decode this audio format")
+    process = subprocess.run(
+        ["ffmpeg", "-loglevel", "error", "-i", "pipe:0", "-f", "s16le", "-ac", "1", "-ar", str(sample_rate), "pipe:1"],
+        input=data,
+        capture_output=True,
+        check=False,
+    )
+    if process.returncode != 0:
+        raise ValueError("audio could not be decoded")
+    return np.frombuffer(process.stdout, dtype="<i2").astype(np.float32) / 32768.0
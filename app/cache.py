@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import Any
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+
+
+def normalize_prompt(prompt: str) -> str:
+    return re.sub(r"\s+", " ", prompt).strip().lower()
+
+
+class ResponseCache:
+    def __init__(self, max_entries: int = 512, ttl: float = 3600.0, db_path: str | None = None) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.db_path = db_path
+        self._entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+        self._conn: sqlite3.Connection | None = None
+        if db_path:
+            self._open_db(db_path)
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def key(self, prompt: str, system_prompt: str, model: str) -> str:
+        raw = "\x1f".join([normalize_prompt(prompt), system_prompt.strip(), model])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> str | None:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self._stats["memory_hits"] += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+            value = self._disk_get(key, now)
+            if value is not None:
+                self._stats["disk_hits"] += 1
+                self._remember(key, value[0], value[1])
+                return value[1]
+            self._stats["misses"] += 1
+            return None
+
+    def set(self, key: str, value: str) -> None:
+        expires_at = time.time() + self.ttl
+        with self._lock:
+            self._stats["stores"] += 1
+            self._remember(key, expires_at, value)
+            if self._conn is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, value, expires_at) VALUES (?, ?, ?)",
+                    (key, value, expires_at),
+                )
+                self._conn.commit()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            stats: dict[str, Any] = dict(self._stats)
+            stats["entries"] = len(self._entries)
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = round((stats["memory_hits"] + stats["disk_hits"]) / lookups, 3) if lookups else None
+        stats["disk"] = self.db_path
+        return stats
+
+    def _remember(self, key: str, expires_at: float, value: str) -> None:
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def _open_db(self, db_path: str) -> None:
+        directory = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._conn.execute("DELETE FROM responses WHERE expires_at <= ?", (time.time(),))
+        self._conn.commit()
+
+    def _disk_get(self, key: str, now: float) -> tuple[float, str] | None:
+        if self._conn is None:
+            return None
+        row = self._conn.execute("SELECT expires_at, value FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        if row[0] <= now:
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._conn.commit()
+            return None
+        return row[0], row[1]
+
+
+_cache: ResponseCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ResponseCache(
+                    max_entries=int(os.getenv("LLM_CACHE_SIZE", "512")),
+                    ttl=float(os.getenv("LLM_CACHE_TTL", "3600")),
+                    db_path=os.getenv("LLM_CACHE_PATH") or None,
+                )
+    return _cache
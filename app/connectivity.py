@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+from typing import Any
+import os
+import threading
+import time
+
+import requests
+
+from app.http_client import get_http_client
+
+PROBE_URL = "https://api.duckduckgo.com/"
+
+
+class ConnectivityMonitor:
+    def __init__(
+        self,
+        probe_url: str = PROBE_URL,
+        ttl: float = 30.0,
+        timeout: float = 3.0,
+        min_interval: float = 2.0,
+    ) -> None:
+        self.probe_url = probe_url
+        self.ttl = ttl
+        self.timeout = timeout
+        self.min_interval = min_interval
+        self._online = True
+        self._checked_at = 0.0
+        self._source = "assumed"
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def is_online(self) -> bool:
+        self._ensure_started()
+        return self._online
+
+    def state(self) -> dict[str, Any]:
+        return {
+            "online": self._online,
+            "checked_at": self._checked_at,
+            "age": round(time.monotonic() - self._checked_at, 3) if self._checked_at else None,
+            "source": self._source,
+        }
+
+    def report_success(self) -> None:
+        self._update(True, "provider")
+
+    def report_failure(self) -> None:
+        self._wake.set()
+
+    def refresh(self) -> bool:
+        try:
+            response = get_http_client().get(self.probe_url, params={"q": "ping", "format": "json"}, timeout=self.timeout)
+            online = response.status_code < 400
+        except requests.RequestException:
+            online = False
+        self._update(online, "probe")
+        return online
+
+    def _update(self, online: bool, source: str) -> None:
+        with self._lock:
+            self._online = online
+            self._checked_at = time.monotonic()
+            self._source = source
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="connectivity-probe", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            age = time.monotonic() - self._checked_at
+            if self._checked_at and age < self.ttl and not self._wake.is_set():
+                self._wake.wait(self.ttl - age)
+                continue
+            if self._checked_at and age < self.min_interval:
+                time.sleep(self.min_interval - age)
+            self._wake.clear()
+            self.refresh()
+
+
+_monitor: ConnectivityMonitor | None = None
+_monitor_lock = threading.Lock()
+
+
+def get_connectivity_monitor() -> ConnectivityMonitor:
+    global _monitor
+    if _monitor is None:
+        with _monitor_lock:
+            if _monitor is None:
+                _monitor = ConnectivityMonitor(
+                    probe_url=os.getenv("CONNECTIVITY_PROBE_URL", PROBE_URL),
+                    ttl=float(os.getenv("CONNECTIVITY_TTL", "30")),
+                )
+    return _monitor
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+from collections import deque
+from typing import Any
+import os
+import threading
+import time
+
+from app.latency import get_latency_histogram
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int, reset_timeout: float, window: int) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.changed_at = time.monotonic()
+        self.outcomes: deque[bool] = deque(maxlen=window)
+
+    @property
+    def success_rate(self) -> float | None:
+        if not self.outcomes:
+            return None
+        return sum(self.outcomes) / len(self.outcomes)
+
+    def available(self) -> bool:
+        return self.state == CLOSED or time.monotonic() - self.changed_at >= self.reset_timeout
+
+    def allow(self) -> bool:
+        if self.state == CLOSED:
+            return True
+        if time.monotonic() - self.changed_at < self.reset_timeout:
+            return False
+        self.state = HALF_OPEN
+        self.changed_at = time.monotonic()
+        return True
+
+    def release(self) -> None:
+        # A trial that ended without a verdict (empty reply, cancelled call) reopens the slot at once.
+        if self.state == HALF_OPEN:
+            self.state = OPEN
+            self.changed_at = time.monotonic() - self.reset_timeout
+
+    def record_success(self) -> None:
+        self.outcomes.append(True)
+        self.consecutive_failures = 0
+        if self.state != CLOSED:
+            self.state = CLOSED
+            self.changed_at = time.monotonic()
+
+    def record_failure(self) -> None:
+        self.outcomes.append(False)
+        self.consecutive_failures += 1
+        if self.state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            self.state = OPEN
+            self.changed_at = time.monotonic()
+
+
+class ProviderHealth:
+    def __init__(
+        self,
+        failure_threshold: int = 3,
+        reset_timeout: float = 30.0,
+        window: int = 50,
+        min_samples: int = 5,
+        adaptive: bool = True,
+    ) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.window = window
+        self.min_samples = min_samples
+        self.adaptive = adaptive
+        self._breakers: dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def order(self, provider_chain: list[str]) -> list[str]:
+        # Ordering only reads breaker state; the half-open trial is claimed by acquire() right before a call.
+        with self._lock:
+            allowed = [name for name in provider_chain if self._breaker(name).available()]
+        if not allowed:
+            return list(provider_chain)
+        if not self.adaptive:
+            return allowed
+        return [name for _, name in sorted(enumerate(allowed), key=self._rank)]
+
+    def acquire(self, provider: str, provider_chain: list[str]) -> bool:
+        with self._lock:
+            if self._breaker(provider).allow():
+                return True
+            # As in order(), when every breaker in the chain is open the providers are tried anyway.
+            return not any(self._breaker(name).available() for name in provider_chain)
+
+    def release(self, provider: str) -> None:
+        with self._lock:
+            self._breaker(provider).release()
+
+    def record_success(self, provider: str) -> None:
+        with self._lock:
+            self._breaker(provider).record_success()
+
+    def record_failure(self, provider: str) -> None:
+        with self._lock:
+            self._breaker(provider).record_failure()
+
+    def snapshot(self) -> dict[str, dict[str, Any]]:
+        with self._lock:
+            return {
+                name: {
+                    "state": breaker.state,
+                    "consecutive_failures": breaker.consecutive_failures,
+                    "success_rate": breaker.success_rate,
+                    "samples": len(breaker.outcomes),
+                }
+                for name, breaker in sorted(self._breakers.items())
+            }
+
+    def _rank(self, item: tuple[int, str]) -> tuple[Any, ...]:
+        index, name = item
+        breaker = self._breakers[name]
+        latency = get_latency_histogram(name).percentile(0.5)
+        success_rate = breaker.success_rate
+        if latency is None or success_rate is None or len(breaker.outcomes) < self.min_samples:
+            return (1, index)
+        return (0, latency / max(success_rate, 0.05), index)
+
+    def _breaker(self, provider: str) -> CircuitBreaker:
+        breaker = self._breakers.get(provider)
+        if breaker is None:
+            breaker = CircuitBreaker(self.failure_threshold, self.reset_timeout, self.window)
+            self._breakers[provider] = breaker
+        return breaker
+
+
+_health: ProviderHealth | None = None
+_health_lock = threading.Lock()
+
+
+def get_provider_health() -> ProviderHealth:
+    global _health
+    if _health is None:
+        with _health_lock:
+            if _health is None:
+                _health = ProviderHealth(
+                    failure_threshold=int(os.getenv("LLM_BREAKER_THRESHOLD", "3")),
+                    reset_timeout=float(os.getenv("LLM_BREAKER_RESET", "30")),
+                    adaptive=os.getenv("LLM_ADAPTIVE_ORDER", "1") != "0",
+                )
+    return _health
@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+from collections import Counter
+from contextlib import AbstractAsyncContextManager
+from typing import Any
+from urllib.parse import urlsplit
+import importlib.util
+import os
+import threading
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class HttpClient:
+    def __init__(self, pool_connections: int = 10, pool_maxsize: int = 20, timeout: float = 10.0) -> None:
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.timeout = timeout
+        self.session = requests.Session()
+        self._adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        self.session.mount("http://", self._adapter)
+        self.session.mount("https://", self._adapter)
+        self._requests: Counter[str] = Counter()
+        self._lock = threading.Lock()
+
+    def get(self, url: str, **kwargs: Any) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs: Any) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def request(self, method: str, url: str, **kwargs: Any) -> requests.Response:
+        kwargs.setdefault("timeout", self.timeout)
+        with self._lock:
+            self._requests[urlsplit(url).netloc] += 1
+        return self.session.request(method, url, **kwargs)
+
+    def pool_stats(self) -> dict[str, Any]:
+        pools = self._adapter.poolmanager.pools
+        hosts: dict[str, dict[str, Any]] = {}
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            host = f"{pool.host}:{pool.port}" if pool.port else pool.host
+            opened = pool.num_connections
+            served = pool.num_requests
+            hosts[host] = {
+                "connections_opened": opened,
+                "requests": served,
+                "idle_connections": pool.pool.qsize() if pool.pool is not None else 0,
+                "reuse_ratio": round(1 - opened / served, 3) if served else None,
+            }
+        with self._lock:
+            requests_by_host = dict(self._requests)
+        return {
+            "pool_connections": self.pool_connections,
+            "pool_maxsize": self.pool_maxsize,
+            "timeout": self.timeout,
+            "requests_by_host": requests_by_host,
+            "pools": hosts,
+        }
+
+
+class AsyncHttpClient:
+    def __init__(self, max_connections: int = 100, max_keepalive: int = 20, timeout: float = 10.0) -> None:
+        self.max_connections = max_connections
+        self.max_keepalive = max_keepalive
+        self.timeout = timeout
+        self.http2 = importlib.util.find_spec("h2") is not None
+        self.client = httpx.AsyncClient(
+            http2=self.http2,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_keepalive),
+            timeout=timeout,
+        )
+        self._requests: Counter[str] = Counter()
+
+    async def get(self, url: str, **kwargs: Any) -> httpx.Response:
+        self._count(url)
+        return await self.client.get(url, **kwargs)
+
+    async def post(self, url: str, **kwargs: Any) -> httpx.Response:
+        self._count(url)
+        return await self.client.post(url, **kwargs)
+
+    def stream(self, method: str, url: str, **kwargs: Any) -> AbstractAsyncContextManager[httpx.Response]:
+        self._count(url)
+        return self.client.stream(method, url, **kwargs)
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+    def pool_stats(self) -> dict[str, Any]:
+        return {
+            "http2": self.http2,
+            "max_connections": self.max_connections,
+            "max_keepalive": self.max_keepalive,
+            "timeout": self.timeout,
+            "requests_by_host": dict(self._requests),
+        }
+
+    def _count(self, url: str) -> None:
+        self._requests[urlsplit(url).netloc] += 1
+
+
+_client: HttpClient | None = None
+_async_client: AsyncHttpClient | None = None
+_client_lock = threading.Lock()
+
+
+def get_http_client() -> HttpClient:
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = HttpClient(
+                    pool_connections=int(os.getenv("HTTP_POOL_CONNECTIONS", "10")),
+                    pool_maxsize=int(os.getenv("HTTP_POOL_MAXSIZE", "20")),
+                    timeout=float(os.getenv("HTTP_TIMEOUT", "10")),
+                )
+    return _client
+
+
+def get_async_http_client() -> AsyncHttpClient:
+    global _async_client
+    if _async_client is None:
+        with _client_lock:
+            if _async_client is None:
+                _async_client = AsyncHttpClient(
+                    max_connections=int(os.getenv("HTTP_MAX_CONNECTIONS", "100")),
+                    max_keepalive=int(os.getenv("HTTP_POOL_MAXSIZE", "20")),
+                    timeout=float(os.getenv("HTTP_TIMEOUT", "10")),
+                )
+    return _async_client
@@ -0,0 +1,424 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Iterable
+import argparse
+import importlib.util
+import json
+import os
+import random
+import re
+import sqlite3
+import threading
+import zlib
+
+from app.intents import clean_query, extract_numbers, get_intent_engine
+
+np = None
+if importlib.util.find_spec("numpy") is not None:
+    import numpy as np  # type: ignore
+
+GENERAL = "general"
+WORD = re.compile(r"[a-z0-9']+")
+SEARCH_VERBS = re.compile(
+    r"^(?:please\s+)?(?:look\s+up|google|wikipedia|search(?:\s+the\s+web)?(?:\s+for)?|find(?:\s+me)?)\s+", re.IGNORECASE
+)
+LAUNCH_WORDS = frozenset(
+    "please can could you would open launch start run fire up bring boot load close quit exit kill stop shut "
+    "down terminate end the my app application program window".split()
+)
+
+SEED_EXAMPLES: tuple[tuple[str, str], ...] = (
+    ("open_app", "open notepad"),
+    ("open_app", "launch spotify"),
+    ("open_app", "start chrome"),
+    ("open_app", "fire up the terminal"),
+    ("open_app", "run calculator"),
+    ("open_app", "bring up vs code"),
+    ("open_app", "can you launch firefox"),
+    ("open_app", "please start the music player"),
+    ("open_app", "boot up steam"),
+    ("open_app", "load excel"),
+    ("open_app", "launch the file explorer"),
+    ("open_app", "start word for me"),
+    ("close_app", "close notepad"),
+    ("close_app", "quit spotify"),
+    ("close_app", "kill chrome"),
+    ("close_app", "exit the terminal"),
+    ("close_app", "shut the calculator"),
+    ("close_app", "terminate steam"),
+    ("close_app", "please quit firefox"),
+    ("close_app", "stop the music player app"),
+    ("close_app", "close excel for me"),
+    ("close_app", "end vs code"),
+    ("stats", "how is my cpu doing"),
+    ("stats", "check cpu usage"),
+    ("stats", "how much ram is free"),
+    ("stats", "memory usage right now"),
+    ("stats", "is my disk full"),
+    ("stats", "how much disk space is left"),
+    ("stats", "what's the system load"),
+    ("stats", "show system stats"),
+    ("stats", "what is my network speed"),
+    ("stats", "how busy is the processor"),
+    ("stats", "pc performance status"),
+    ("stats", "how much storage do I have left"),
+    ("weather", "what's the weather like"),
+    ("weather", "is it going to rain today"),
+    ("weather", "how hot is it outside"),
+    ("weather", "temperature outside"),
+    ("weather", "do I need an umbrella"),
+    ("weather", "forecast for today"),
+    ("weather", "how windy is it"),
+    ("weather", "is it cold today"),
+    ("weather", "will it be sunny tomorrow"),
+    ("weather", "weather 28.6 77.2"),
+    ("weather", "current temperature please"),
+    ("weather", "is it snowing"),
+    ("news", "latest news"),
+    ("news", "today's headlines"),
+    ("news", "what's happening in the world"),
+    ("news", "top stories today"),
+    ("news", "any updates on the election"),
+    ("news", "breaking news about cricket"),
+    ("news", "what happened in tech this week"),
+    ("news", "latest updates on the stock market crash"),
+    ("news", "headlines from india"),
+    ("news", "give me the morning briefing"),
+    ("price", "bitcoin price"),
+    ("price", "how much is bitcoin"),
+    ("price", "what does gold cost today"),
+    ("price", "tesla share value"),
+    ("price", "exchange rate usd to inr"),
+    ("price", "how much is ethereum worth"),
+    ("price", "apple stock price"),
+    ("price", "current price of silver"),
+    ("price", "what is the dollar trading at"),
+    ("price", "nifty index level"),
+    ("web_search", "search python decorators"),
+    ("web_search", "look up the height of mount everest"),
+    ("web_search", "google best pizza nearby"),
+    ("web_search", "find information about black holes"),
+    ("web_search", "wikipedia alan turing"),
+    ("web_search", "look up flights to goa"),
+    ("web_search", "search the web for rust tutorials"),
+    ("web_search", "find me reviews of the pixel phone"),
+    ("web_search", "look up the population of japan"),
+    ("web_search", "google how to fix a flat tyre"),
+    (GENERAL, "tell me a joke"),
+    (GENERAL, "write an email to my boss asking for leave"),
+    (GENERAL, "explain quantum computing simply"),
+    (GENERAL, "how do I cook rice"),
+    (GENERAL, "what should I name my cat"),
+    (GENERAL, "help me plan my day"),
+    (GENERAL, "summarize this paragraph for me"),
+    (GENERAL, "why is the sky blue"),
+    (GENERAL, "can you help me debug this code"),
+    (GENERAL, "translate hello into french"),
+    (GENERAL, "give me a motivational quote"),
+    (GENERAL, "what do you think about artificial intelligence"),
+    (GENERAL, "let's chat for a bit"),
+    (GENERAL, "I'm feeling bored"),
+    (GENERAL, "write a story about a dragon"),
+    (GENERAL, "how can I improve my sleep"),
+    (GENERAL, "compare python and java"),
+    (GENERAL, "what is the meaning of life"),
+    (GENERAL, "good morning divya"),
+    (GENERAL, "thank you so much"),
+    (GENERAL, "who are you"),
+    (GENERAL, "suggest a name for my startup"),
+    (GENERAL, "recommend a good book"),
+    (GENERAL, "how do I say sorry to a friend"),
+)
+
+
+@dataclass
+class IntentPrediction:
+    label: str
+    confidence: float
+    slots: dict[str, Any] = field(default_factory=dict)
+
+
+def launch_target(text: str) -> str:
+    return " ".join(word for word in text.split() if word.lower().strip(",.!?") not in LAUNCH_WORDS)
+
+
+def prediction_slots(label: str, text: str) -> dict[str, Any]:
+    if label in ("open_app", "close_app"):
+        return {"query": launch_target(text)}
+    if label == "weather":
+        numbers = extract_numbers(text)
+        return {"coordinates": (numbers[0], numbers[1])} if len(numbers) >= 2 else {}
+    if label in ("news", "price"):
+        return {"topic": clean_query(text)}
+    if label == "web_search":
+        return {"query": clean_query(SEARCH_VERBS.sub("", text.strip()))}
+    return {}
+
+
+class HashedFeaturizer:
+    def __init__(self, dim: int = 2048) -> None:
+        self.dim = dim
+
+    def transform(self, texts: Iterable[str]) -> Any:
+        texts = list(texts)
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            words = WORD.findall(text.lower())
+            features = [f"w:{word}" for word in words]
+            features += [f"b:{first} {second}" for first, second in zip(words, words[1:])]
+            for word in words:
+                padded = f" {word} "
+                features += [f"c:{padded[start:start + 3]}" for start in range(len(padded) - 2)]
+            for feature in features:
+                matrix[row, zlib.crc32(feature.encode("utf-8")) % self.dim] += 1.0
+        np.log1p(matrix, out=matrix)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        matrix /= np.maximum(norms, 1e-6)
+        return matrix
+
+
+class IntentClassifier:
+    def __init__(self, dim: int = 2048, threshold: float = 0.7) -> None:
+        self.featurizer = HashedFeaturizer(dim)
+        self.threshold = threshold
+        self.labels: list[str] = []
+        self._model: tuple[Any, Any] | None = None
+        self._stats = {"predictions": 0, "confident": 0}
+        self._lock = threading.Lock()
+
+    @property
+    def trained(self) -> bool:
+        return self._model is not None
+
+    def fit(
+        self,
+        examples: Iterable[tuple[str, str]],
+        epochs: int = 500,
+        learning_rate: float = 8.0,
+        l2: float = 1e-5,
+    ) -> IntentClassifier:
+        # Multinomial logistic regression with full-batch gradient descent; classes are weighted
+        # inversely to their frequency so a long command history doesn't drown out the rarer intents.
+        examples = list(dict.fromkeys((label, text.strip()) for label, text in examples if text.strip()))
+        labels = sorted({label for label, _text in examples})
+        index = {label: position for position, label in enumerate(labels)}
+        features = self.featurizer.transform(text for _label, text in examples)
+        targets = np.zeros((len(examples), len(labels)), dtype=np.float32)
+        targets[np.arange(len(examples)), [index[label] for label, _text in examples]] = 1.0
+        counts = targets.sum(axis=0)
+        sample_weights = (len(examples) / (len(labels) * counts))[targets.argmax(axis=1)][:, None]
+        weights = np.zeros((self.featurizer.dim, len(labels)), dtype=np.float32)
+        bias = np.zeros(len(labels), dtype=np.float32)
+        for _epoch in range(epochs):
+            probabilities = self._softmax(features @ weights + bias)
+            error = (probabilities - targets) * sample_weights / len(examples)
+            weights -= learning_rate * (features.T @ error + l2 * weights)
+            bias -= learning_rate * error.sum(axis=0)
+        with self._lock:
+            self.labels = labels
+            self._model = (weights, bias)
+        return self
+
+    def predict(self, text: str) -> IntentPrediction:
+        return self.predict_many([text])[0]
+
+    def predict_many(self, texts: Iterable[str]) -> list[IntentPrediction]:
+        texts = list(texts)
+        with self._lock:
+            model, labels = self._model, self.labels
+        if model is None or not texts:
+            return [IntentPrediction(GENERAL, 0.0) for _text in texts]
+        weights, bias = model
+        probabilities = self._softmax(self.featurizer.transform(texts) @ weights + bias)
+        best = probabilities.argmax(axis=1)
+        predictions = [
+            IntentPrediction(labels[column], float(probabilities[row, column]))
+            for row, column in enumerate(best)
+        ]
+        confident = 0
+        for text, prediction in zip(texts, predictions):
+            if prediction.label != GENERAL and prediction.confidence >= self.threshold:
+                prediction.slots = prediction_slots(prediction.label, text)
+                confident += 1
+        with self._lock:
+            self._stats["predictions"] += len(predictions)
+            self._stats["confident"] += confident
+        return predictions
+
+    def route(self, text: str, labels: Iterable[str] | None = None) -> IntentPrediction | None:
+        prediction = self.predict(text)
+        if prediction.label == GENERAL or prediction.confidence < self.threshold:
+            return None
+        if labels is not None and prediction.label not in labels:
+            return None
+        return prediction
+
+    def save(self, path: str) -> None:
+        with self._lock:
+            if self._model is None:
+                raise ValueError("Classifier is not trained")
+            weights, bias = self._model
+            np.savez_compressed(path, weights=weights, bias=bias, labels=np.array(self.labels))
+
+    def load(self, path: str) -> IntentClassifier:
+        with np.load(path) as data:
+            weights, bias, labels = data["weights"], data["bias"], [str(label) for label in data["labels"]]
+        self.featurizer = HashedFeaturizer(int(weights.shape[0]))
+        with self._lock:
+            self.labels = labels
+            self._model = (weights, bias)
+        return self
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {**self._stats, "labels": list(self.labels), "threshold": self.threshold}
+
+    def _softmax(self, scores: Any) -> Any:
+        scores = scores - scores.max(axis=1, keepdims=True)
+        exponents = np.exp(scores)
+        return exponents / exponents.sum(axis=1, keepdims=True)
+
+
+def command_examples(commands: Iterable[str]) -> list[tuple[str, str]]:
+    # Saved desktop commands ("open ...", "close ...") are labelled by the rule engine.
+    engine = get_intent_engine()
+    examples = []
+    for command in commands:
+        match = engine.classify(command, kinds=("pc_control",))
+        if match is not None and match.keyword in ("open", "close"):
+            examples.append((f"{match.keyword}_app", command))
+    return examples
+
+
+def memory_commands(folder: str, limit: int = 5000) -> list[str]:
+    path = os.path.join(folder, "jarvis_memory.sqlite3")
+    if not os.path.exists(path):
+        return []
+    conn = sqlite3.connect(path)
+    try:
+        rows = conn.execute(
+            "SELECT content FROM memories WHERE category = 'command' ORDER BY timestamp DESC, id DESC LIMIT ?",
+            (limit,),
+        ).fetchall()
+    finally:
+        conn.close()
+    return [row[0] for row in rows]
+
+
+def load_examples(path: str) -> list[tuple[str, str]]:
+    examples = []
+    with open(path, "r", encoding="utf-8") as handle:
+        for line in handle:
+            if line.strip():
+                item = json.loads(line)
+                examples.append((str(item["label"]), str(item["text"])))
+    return examples
+
+
+def evaluate(classifier: IntentClassifier, examples: list[tuple[str, str]]) -> dict[str, Any]:
+    predictions = classifier.predict_many(text for _label, text in examples)
+    routed = [
+        (label, prediction.label)
+        for (label, _text), prediction in zip(examples, predictions)
+        if prediction.label != GENERAL and prediction.confidence >= classifier.threshold
+    ]
+    per_label = {}
+    for label in sorted({label for label, _text in examples} | set(classifier.labels)):
+        predicted = sum(1 for prediction in predictions if prediction.label == label)
+        actual = sum(1 for expected, _text in examples if expected == label)
+        correct = sum(
+            1 for (expected, _text), prediction in zip(examples, predictions) if expected == label == prediction.label
+        )
+        per_label[label] = {
+            "precision": round(correct / predicted, 3) if predicted else None,
+            "recall": round(correct / actual, 3) if actual else None,
+            "support": actual,
+        }
+    correct = sum(1 for (label, _text), prediction in zip(examples, predictions) if label == prediction.label)
+    return {
+        "examples": len(examples),
+        "accuracy": round(correct / len(examples), 3) if examples else None,
+        "routed": len(routed),
+        "routed_accuracy": (
+            round(sum(1 for label, guess in routed if label == guess) / len(routed), 3) if routed else None
+        ),
+        "llm_calls_avoided": round(len(routed) / len(examples), 3) if examples else None,
+        "labels": per_label,
+    }
+
+
+def training_examples(folder: str | None = None, data: Iterable[str] = ()) -> list[tuple[str, str]]:
+    examples = list(SEED_EXAMPLES)
+    if folder:
+        examples += command_examples(memory_commands(folder))
+    for path in data:
+        examples += load_examples(path)
+    return examples
+
+
+_classifier: IntentClassifier | None = None
+_classifier_lock = threading.Lock()
+
+
+def classifier_enabled() -> bool:
+    # Opt-in: on when a trained INTENT_MODEL exists, or when INTENT_CLASSIFIER=1 asks for the seed model.
+    setting = os.getenv("INTENT_CLASSIFIER", "")
+    if np is None or setting == "0":
+        return False
+    model_path = os.getenv("INTENT_MODEL")
+    return setting == "1" or bool(model_path and os.path.exists(model_path))
+
+
+def get_intent_classifier() -> IntentClassifier | None:
+    global _classifier
+    if not classifier_enabled():
+        return None
+    if _classifier is None:
+        with _classifier_lock:
+            if _classifier is None:
+                classifier = IntentClassifier(threshold=float(os.getenv("INTENT_CONFIDENCE", "0.7")))
+                model_path = os.getenv("INTENT_MODEL")
+                if model_path and os.path.exists(model_path):
+                    classifier.load(model_path)
+                else:
+                    classifier.fit(SEED_EXAMPLES)
+                _classifier = classifier
+    return _classifier
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Train or evaluate the local intent classifier.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    train_parser = commands.add_parser("train", help="Train on the seed examples plus saved commands and data files.")
+    train_parser.add_argument("--memory-folder", help="Desktop memory folder whose saved commands are added.")
+    train_parser.add_argument("--data", action="append", default=[], help="JSONL file of {\"label\", \"text\"} rows.")
+    train_parser.add_argument("--out", default="intent_model.npz")
+    train_parser.add_argument("--dim", type=int, default=2048)
+    train_parser.add_argument("--epochs", type=int, default=500)
+    train_parser.add_argument("--holdout", type=float, default=0.2, help="Share of examples kept back for evaluation.")
+    train_parser.add_argument("--seed", type=int, default=7)
+    eval_parser = commands.add_parser("eval", help="Evaluate a saved model on labelled JSONL data.")
+    eval_parser.add_argument("--model", default="intent_model.npz")
+    eval_parser.add_argument("--data", action="append", required=True)
+    eval_parser.add_argument("--threshold", type=float, default=0.7)
+    args = parser.parse_args()
+
+    if args.command == "train":
+        examples = training_examples(args.memory_folder, args.data)
+        random.Random(args.seed).shuffle(examples)
+        held = int(len(examples) * args.holdout)
+        if held:
+            report = evaluate(IntentClassifier(args.dim).fit(examples[held:], epochs=args.epochs), examples[:held])
+            print(json.dumps({"holdout": report}, indent=2))
+        classifier = IntentClassifier(args.dim).fit(examples, epochs=args.epochs)
+        classifier.save(args.out)
+        print(f"trained on {len(examples)} examples, saved to {args.out}")
+    else:
+        classifier = IntentClassifier(threshold=args.threshold).load(args.model)
+        examples = [example for path in args.data for example in load_examples(path)]
+        print(json.dumps(evaluate(classifier, examples), indent=2))
+
+
+if __name__ == "__main__":
+    main()
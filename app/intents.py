@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from functools import lru_cache, partial
+from typing import Any, Callable, Iterable
+import os
+import re
+import threading
+
+NUMBER = re.compile(r"-?\d+(?:\.\d+)?")
+QUERY_FILLERS = frozenset(("for", "of", "about", "on"))
+QUERY_STRIP = " :?!.,"
+
+
+@dataclass(frozen=True)
+class IntentRule:
+    kind: str
+    keywords: tuple[str, ...]
+    anchored: bool = False
+    slots: tuple[str, ...] = ()
+
+
+# Earlier rules win when several match. Keywords match anywhere in the lowercased utterance, except
+# anchored ones, which only count at its start.
+INTENT_RULES: tuple[IntentRule, ...] = (
+    IntentRule("pc_control", ("open ", "close "), anchored=True, slots=("query",)),
+    IntentRule("web_search", ("search",), slots=("query",)),
+    IntentRule("web_search", ("find ",), anchored=True, slots=("query",)),
+    IntentRule("pc_control", ("volume", "brightness", "screenshot", "type ", "press ", "click "), slots=("numbers",)),
+    IntentRule("writing", ("shayari", "poem")),
+    IntentRule("stats", ("stats", "status")),
+    IntentRule("weather", ("weather",), slots=("coordinates",)),
+    IntentRule("news", ("news",), slots=("topic",)),
+    IntentRule("price", ("price", "stock"), slots=("topic",)),
+)
+
+
+@dataclass(frozen=True)
+class IntentMatch:
+    kind: str
+    keyword: str
+    slots: dict[str, Any] = field(default_factory=dict)
+
+
+def clean_query(text: str) -> str:
+    return join_query(text.strip(QUERY_STRIP).split())
+
+
+def join_query(words: list[str]) -> str:
+    if len(words) > 1 and words[0].lower() in QUERY_FILLERS:
+        # Leading fillers are dropped, but never the last word ("search for" keeps "for").
+        start = 1
+        while start < len(words) - 1 and words[start].lower() in QUERY_FILLERS:
+            start += 1
+        words = words[start:]
+    return " ".join(words).strip(QUERY_STRIP)
+
+
+def extract_numbers(text: str) -> list[float]:
+    return [float(value) for value in NUMBER.findall(text)]
+
+
+SlotFiller = Callable[[str, str, str], Any]
+
+
+class IntentMatcher:
+    # Every keyword goes into one alternation, ordered by rule priority, so a single left-to-right scan
+    # tests all rules at each position. A hit only lets the scan go on (from the next character) with the
+    # keywords of higher-priority rules, and it stops once nothing could outrank the best hit so far.
+    def __init__(self, rules: Iterable[IntentRule]) -> None:
+        steps = []
+        keywords: list[tuple[str, bool]] = []
+        self.ranks: dict[str, int] = {}
+        for rank, rule in enumerate(rules):
+            steps.append((rule.kind, tuple((name, slot_filler(rule, name)) for name in rule.slots)))
+            for keyword in rule.keywords:
+                if keyword not in self.ranks:
+                    self.ranks[keyword] = rank
+                    keywords.append((keyword, rule.anchored))
+        self.steps = tuple(steps)
+        # patterns[rank] holds the keywords of the rules that outrank it, so patterns[0] is None.
+        self.patterns = tuple(
+            compile_keywords([(keyword, anchored) for keyword, anchored in keywords if self.ranks[keyword] < rank])
+            for rank in range(len(self.steps) + 1)
+        )
+
+    def match(self, text: str) -> IntentMatch | None:
+        text = text.strip()
+        lowered = text.lower()
+        patterns, ranks = self.patterns, self.ranks
+        hit = patterns[-1].search(lowered) if patterns[-1] else None
+        if hit is None:
+            return None
+        keyword = hit.group()
+        rank = ranks[keyword]
+        while patterns[rank]:
+            hit = patterns[rank].search(lowered, hit.start() + 1)
+            if hit is None:
+                break
+            keyword = hit.group()
+            rank = ranks[keyword]
+        kind, fillers = self.steps[rank]
+        slots = {}
+        if fillers:
+            # Slots are cut from the original text (keeping case) unless lowering changed its length.
+            source = text if len(text) == len(lowered) else lowered
+            for name, fill in fillers:
+                value = fill(source, lowered, keyword)
+                if value:
+                    slots[name] = value
+        return IntentMatch(kind, keyword.strip(), slots)
+
+
+def compile_keywords(keywords: list[tuple[str, bool]]) -> re.Pattern[str] | None:
+    if not keywords:
+        return None
+    # \A holds at the real start of the string even when search() starts later, so anchored keywords
+    # can only hit on the first attempt.
+    return re.compile("|".join(("\\A" if anchored else "") + re.escape(keyword) for keyword, anchored in keywords))
+
+
+class IntentEngine:
+    def __init__(self, rules: Iterable[IntentRule] = INTENT_RULES, cache_size: int = 1024) -> None:
+        self.rules = tuple(rules)
+        self._matchers: dict[frozenset[str] | None, IntentMatcher] = {}
+        self._lock = threading.Lock()
+        # Assistants hear the same commands over and over; repeated utterances skip matching entirely.
+        # Matches are shared between callers, so their slots must be treated as read-only.
+        self._match = lru_cache(maxsize=cache_size)(self._classify) if cache_size > 0 else self._classify
+
+    def classify(self, text: str, kinds: Iterable[str] | None = None) -> IntentMatch | None:
+        return self._match(text, None if kinds is None else frozenset(kinds))
+
+    def _classify(self, text: str, kinds: frozenset[str] | None) -> IntentMatch | None:
+        return self._matcher(kinds).match(text)
+
+    def _matcher(self, kinds: frozenset[str] | None) -> IntentMatcher:
+        matcher = self._matchers.get(kinds)
+        if matcher is None:
+            with self._lock:
+                matcher = self._matchers.get(kinds)
+                if matcher is None:
+                    matcher = IntentMatcher(rule for rule in self.rules if kinds is None or rule.kind in kinds)
+                    self._matchers[kinds] = matcher
+        return matcher
+
+
+def slot_filler(rule: IntentRule, name: str) -> SlotFiller:
+    if name == "query":
+        return query_slot
+    if name == "topic":
+        # Topics drop the rule's keywords as whole words (with an optional plural s) only.
+        words = [keyword.strip() for keyword in rule.keywords]
+        return partial(topic_slot, frozenset(words + [f"{word}s" for word in words]))
+    if name == "numbers":
+        return numbers_slot
+    if name == "coordinates":
+        return coordinates_slot
+    raise ValueError(f"Unknown slot: {name}")
+
+
+def query_slot(text: str, lowered: str, keyword: str) -> str:
+    start = lowered.find(keyword)
+    return clean_query(text[start + len(keyword) :]) or clean_query(text[:start])
+
+
+def topic_slot(stopwords: frozenset[str], _text: str, lowered: str, _keyword: str) -> str:
+    return join_query([word for word in lowered.split() if word.strip(QUERY_STRIP) not in stopwords])
+
+
+def numbers_slot(text: str, _lowered: str, _keyword: str) -> list[float]:
+    return extract_numbers(text)
+
+
+def coordinates_slot(text: str, _lowered: str, _keyword: str) -> tuple[float, float] | None:
+    numbers = extract_numbers(text)
+    return (numbers[0], numbers[1]) if len(numbers) >= 2 else None
+
+
+_engine: IntentEngine | None = None
+_engine_lock = threading.Lock()
+
+
+def get_intent_engine() -> IntentEngine:
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = IntentEngine(cache_size=int(os.getenv("INTENT_CACHE_SIZE", "1024")))
+    return _engine
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+from bisect import bisect_left
+from typing import Any
+import threading
+
+BUCKETS = (0.05, 0.1, 0.2, 0.35, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 5.0, 7.5, 10.0, 15.0, 20.0, 30.0)
+
+
+class LatencyHistogram:
+    def __init__(self, buckets: tuple[float, ...] = BUCKETS, max_samples: int = 1000) -> None:
+        self.buckets = buckets
+        self.max_samples = max_samples
+        self._counts = [0.0] * (len(buckets) + 1)
+        self._total = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def count(self) -> float:
+        return self._total
+
+    def observe(self, seconds: float) -> None:
+        with self._lock:
+            self._counts[bisect_left(self.buckets, seconds)] += 1
+            self._total += 1
+            if self._total > self.max_samples:
+                self._counts = [value / 2 for value in self._counts]
+                self._total /= 2
+
+    def percentile(self, fraction: float) -> float | None:
+        with self._lock:
+            if not self._total:
+                return None
+            target = self._total * fraction
+            running = 0.0
+            for index, value in enumerate(self._counts):
+                running += value
+                if running >= target:
+                    return self.buckets[min(index, len(self.buckets) - 1)]
+        return self.buckets[-1]
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "count": round(self._total, 1),
+            "p50": self.percentile(0.5),
+            "p90": self.percentile(0.9),
+            "p99": self.percentile(0.99),
+        }
+
+
+_histograms: dict[str, LatencyHistogram] = {}
+_histograms_lock = threading.Lock()
+
+
+def get_latency_histogram(name: str) -> LatencyHistogram:
+    histogram = _histograms.get(name)
+    if histogram is None:
+        with _histograms_lock:
+            histogram = _histograms.setdefault(name, LatencyHistogram())
+    return histogram
+
+
+def latency_snapshot() -> dict[str, dict[str, Any]]:
+    return {name: histogram.snapshot() for name, histogram in sorted(_histograms.items())}
@@ -1,10 +1,29 @@
 from __future__ import annotations
 
-from typing import Any
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterator
+import asyncio
+import json
 import os
+import time
 
+import httpx
 import requests
 
+from app.cache import get_response_cache
+from app.connectivity import get_connectivity_monitor
+from app.health import get_provider_health
+from app.http_client import get_async_http_client, get_http_client
+from app.latency import get_latency_histogram
+from app.semantic_cache import get_semantic_cache
+from app.tokens import count_tokens, fit_history
+
+REMOTE_PROVIDERS = ("gemini", "openrouter", "huggingface")
+PROVIDER_TIMEOUT = 20
+HEDGE_DEFAULT_DELAY = 2.0
+HEDGE_MIN_SAMPLES = 10
+NETWORK_ERRORS = (requests.ConnectionError, requests.Timeout, httpx.TransportError)
+
 DEFAULT_SYSTEM_PROMPT = (
     "You are Divya, a polite, helpful AI assistant with a warm, friendly tone. "
     "You are a Jarvis-style system controller for the user's own PC. "
@@ -12,6 +31,10 @@ DEFAULT_SYSTEM_PROMPT = (
 )
 
 
+class ProviderError(RuntimeError):
+    pass
+
+
 class LLMRouter:
     def __init__(self) -> None:
         self.ollama_host = os.getenv("OLLAMA_HOST", "http://localhost:11434")
@@ -21,43 +44,414 @@ class LLMRouter:
         self.openrouter_model = os.getenv("OPENROUTER_MODEL", "openai/gpt-4o-mini")
         self.hf_api_key = os.getenv("HF_API_KEY")
         self.hf_model = os.getenv("HF_MODEL", "google/flan-t5-large")
+        self.race_mode = os.getenv("LLM_RACE_MODE", "off")
+        self.race_width = int(os.getenv("LLM_RACE_WIDTH", "2"))
+        self.hedge_percentile = float(os.getenv("LLM_HEDGE_PERCENTILE", "0.9"))
+        self.context_budget = int(os.getenv("LLM_CONTEXT_BUDGET", "3000"))
+        self._init_runtime()
+
+    def _init_runtime(self) -> None:
+        self.connectivity = get_connectivity_monitor()
+        self.health = get_provider_health()
+        self.cache = get_response_cache()
+        self.semantic_cache = get_semantic_cache()
+        self.http = get_http_client()
+        self.async_http = get_async_http_client()
+        # Losing sync calls cannot be cancelled and run to completion, so the pool leaves room for a few
+        # overlapping races of LLM_RACE_WIDTH calls each.
+        self._executor = ThreadPoolExecutor(max_workers=max(4, 4 * self.race_width), thread_name_prefix="llm-race")
 
     def select_provider_chain(self, need_reasoning: bool, need_realtime: bool) -> list[str]:
         if self.llm_provider and self.llm_provider != "auto":
             return [self.llm_provider]
-        online = self._is_online()
+        online = self.connectivity.is_online()
         if not online:
             return ["ollama"]
         if need_realtime:
-            return ["gemini", "openrouter", "huggingface", "ollama"]
+            return self.health.order(["gemini", "openrouter", "huggingface", "ollama"])
         if need_reasoning:
-            return ["ollama", "openrouter", "gemini", "huggingface"]
-        return ["ollama", "gemini", "openrouter", "huggingface"]
+            return self.health.order(["ollama", "openrouter", "gemini", "huggingface"])
+        return self.health.order(["ollama", "gemini", "openrouter", "huggingface"])
 
     def generate(
         self,
         prompt: str,
         *,
         system_prompt: str | None = None,
+        history: list[dict[str, str]] | None = None,
         need_reasoning: bool = False,
         need_realtime: bool = False,
+        use_cache: bool = True,
+        refresh_cache: bool = False,
     ) -> str:
+        options = {"system_prompt": system_prompt, "history": history or None}
+        cache_key = self._cache_key(prompt, system_prompt, use_cache and not history, need_realtime)
+        if cache_key and not refresh_cache:
+            cached = self._cached_reply(cache_key, prompt, system_prompt)
+            if cached:
+                return cached
         provider_map = {
             "ollama": self._try_ollama,
             "gemini": self._try_gemini,
             "openrouter": self._try_openrouter,
             "huggingface": self._try_huggingface,
         }
-        provider_chain = [provider_map[key] for key in self.select_provider_chain(need_reasoning, need_realtime)]
+        provider_chain = self.select_provider_chain(need_reasoning, need_realtime)
+        if self._racing(provider_chain):
+            response, last_error = self._race(provider_chain, provider_map, prompt, options)
+        else:
+            response, last_error = self._failover(provider_chain, provider_map, prompt, options)
+        if not response:
+            return self._failure_reply(last_error)
+        if cache_key:
+            self._store_reply(cache_key, prompt, system_prompt, response)
+        return response
+
+    def stream(
+        self,
+        prompt: str,
+        *,
+        system_prompt: str | None = None,
+        history: list[dict[str, str]] | None = None,
+        need_reasoning: bool = False,
+        need_realtime: bool = False,
+        use_cache: bool = True,
+        refresh_cache: bool = False,
+    ) -> Iterator[str]:
+        options = {"system_prompt": system_prompt, "history": history or None}
+        cache_key = self._cache_key(prompt, system_prompt, use_cache and not history, need_realtime)
+        if cache_key and not refresh_cache:
+            cached = self._cached_reply(cache_key, prompt, system_prompt)
+            if cached:
+                yield cached
+                return
+        provider_map = {
+            "ollama": self._stream_ollama,
+            "gemini": self._stream_gemini,
+            "openrouter": self._stream_openrouter,
+            "huggingface": self._stream_huggingface,
+        }
+        provider_chain = self.select_provider_chain(need_reasoning, need_realtime)
+        last_error = None
+        for name in provider_chain:
+            if not self.health.acquire(name, provider_chain):
+                continue
+            chunks: list[str] = []
+            try:
+                for chunk in provider_map[name](prompt, **options):
+                    if chunk:
+                        if not chunks:
+                            self._report_success(name)
+                        chunks.append(chunk)
+                        yield chunk
+            except Exception as exc:  # noqa: BLE001
+                self._report_failure(name, exc)
+                last_error = exc
+                if chunks:
+                    return
+            finally:
+                self.health.release(name)
+            if chunks:
+                if cache_key:
+                    self._store_reply(cache_key, prompt, system_prompt, "".join(chunks))
+                return
+        yield self._failure_reply(last_error)
+
+    async def agenerate(
+        self,
+        prompt: str,
+        *,
+        system_prompt: str | None = None,
+        history: list[dict[str, str]] | None = None,
+        need_reasoning: bool = False,
+        need_realtime: bool = False,
+        use_cache: bool = True,
+        refresh_cache: bool = False,
+    ) -> str:
+        options = {"system_prompt": system_prompt, "history": history or None}
+        cache_key = self._cache_key(prompt, system_prompt, use_cache and not history, need_realtime)
+        # The SQLite tier and the semantic cache block, so lookups and stores run off the event loop.
+        if cache_key and not refresh_cache:
+            cached = await asyncio.to_thread(self._cached_reply, cache_key, prompt, system_prompt)
+            if cached:
+                return cached
+        provider_map = {
+            "ollama": self._atry_ollama,
+            "gemini": self._atry_gemini,
+            "openrouter": self._atry_openrouter,
+            "huggingface": self._atry_huggingface,
+        }
+        provider_chain = self.select_provider_chain(need_reasoning, need_realtime)
+        if self._racing(provider_chain):
+            response, last_error = await self._arace(provider_chain, provider_map, prompt, options)
+        else:
+            response, last_error = await self._afailover(provider_chain, provider_map, prompt, options)
+        if not response:
+            return self._failure_reply(last_error)
+        if cache_key:
+            await asyncio.to_thread(self._store_reply, cache_key, prompt, system_prompt, response)
+        return response
+
+    async def astream(
+        self,
+        prompt: str,
+        *,
+        system_prompt: str | None = None,
+        history: list[dict[str, str]] | None = None,
+        need_reasoning: bool = False,
+        need_realtime: bool = False,
+        use_cache: bool = True,
+        refresh_cache: bool = False,
+    ) -> AsyncIterator[str]:
+        options = {"system_prompt": system_prompt, "history": history or None}
+        cache_key = self._cache_key(prompt, system_prompt, use_cache and not history, need_realtime)
+        if cache_key and not refresh_cache:
+            cached = await asyncio.to_thread(self._cached_reply, cache_key, prompt, system_prompt)
+            if cached:
+                yield cached
+                return
+        provider_map = {
+            "ollama": self._astream_ollama,
+            "gemini": self._astream_gemini,
+            "openrouter": self._astream_openrouter,
+            "huggingface": self._astream_huggingface,
+        }
+        provider_chain = self.select_provider_chain(need_reasoning, need_realtime)
+        last_error = None
+        for name in provider_chain:
+            if not self.health.acquire(name, provider_chain):
+                continue
+            chunks: list[str] = []
+            try:
+                async for chunk in provider_map[name](prompt, **options):
+                    if chunk:
+                        if not chunks:
+                            self._report_success(name)
+                        chunks.append(chunk)
+                        yield chunk
+            except Exception as exc:  # noqa: BLE001
+                self._report_failure(name, exc)
+                last_error = exc
+                if chunks:
+                    return
+            finally:
+                self.health.release(name)
+            if chunks:
+                if cache_key:
+                    await asyncio.to_thread(self._store_reply, cache_key, prompt, system_prompt, "".join(chunks))
+                return
+        yield self._failure_reply(last_error)
+
+    def model_signature(self) -> str:
+        return "|".join(
+            [self.llm_provider or "auto", "llama3.1", "gemini-1.5-flash", self.openrouter_model, self.hf_model]
+        )
+
+    def _cache_key(self, prompt: str, system_prompt: str | None, use_cache: bool, need_realtime: bool) -> str | None:
+        if not use_cache or need_realtime or not self.cache.enabled:
+            return None
+        return self.cache.key(prompt, system_prompt or DEFAULT_SYSTEM_PROMPT, self.model_signature())
+
+    def _cached_reply(self, cache_key: str, prompt: str, system_prompt: str | None) -> str | None:
+        cached = self.cache.get(cache_key)
+        if cached or self.semantic_cache is None:
+            return cached
+        return self.semantic_cache.get(prompt, self._cache_scope(system_prompt))
+
+    def _store_reply(self, cache_key: str, prompt: str, system_prompt: str | None, response: str) -> None:
+        self.cache.set(cache_key, response)
+        if self.semantic_cache is not None:
+            self.semantic_cache.set(prompt, self._cache_scope(system_prompt), response)
+
+    def _cache_scope(self, system_prompt: str | None) -> str:
+        return f"{(system_prompt or DEFAULT_SYSTEM_PROMPT).strip()}\x1f{self.model_signature()}"
+
+    def _racing(self, provider_chain: list[str]) -> bool:
+        return self.race_mode in ("race", "hedge") and self.race_width > 1 and len(provider_chain) > 1
+
+    def _hedge_delay(self, provider: str) -> float:
+        if self.race_mode == "race":
+            return 0.0
+        histogram = get_latency_histogram(provider)
+        if histogram.count < HEDGE_MIN_SAMPLES:
+            return HEDGE_DEFAULT_DELAY
+        return histogram.percentile(self.hedge_percentile) or HEDGE_DEFAULT_DELAY
+
+    def _timed(
+        self, name: str, provider: Callable[..., str | None], prompt: str, options: dict[str, Any]
+    ) -> str | None:
+        started = time.perf_counter()
+        response = provider(prompt, **options)
+        if response:
+            get_latency_histogram(name).observe(time.perf_counter() - started)
+        return response
+
+    async def _atimed(
+        self, name: str, provider: Callable[..., Awaitable[str | None]], prompt: str, options: dict[str, Any]
+    ) -> str | None:
+        started = time.perf_counter()
+        response = await provider(prompt, **options)
+        if response:
+            get_latency_histogram(name).observe(time.perf_counter() - started)
+        return response
+
+    def _failover(
+        self,
+        provider_chain: list[str],
+        provider_map: dict[str, Callable[..., str | None]],
+        prompt: str,
+        options: dict[str, Any],
+    ) -> tuple[str | None, Exception | None]:
+        last_error = None
+        for name in provider_chain:
+            if not self.health.acquire(name, provider_chain):
+                continue
+            try:
+                response = self._timed(name, provider_map[name], prompt, options)
+                if response:
+                    self._report_success(name)
+                    return response, last_error
+            except Exception as exc:  # noqa: BLE001
+                self._report_failure(name, exc)
+                last_error = exc
+                continue
+            finally:
+                self.health.release(name)
+        return None, last_error
+
+    async def _afailover(
+        self,
+        provider_chain: list[str],
+        provider_map: dict[str, Callable[..., Awaitable[str | None]]],
+        prompt: str,
+        options: dict[str, Any],
+    ) -> tuple[str | None, Exception | None]:
         last_error = None
-        for provider in provider_chain:
+        for name in provider_chain:
+            if not self.health.acquire(name, provider_chain):
+                continue
             try:
-                response = provider(prompt, system_prompt=system_prompt)
+                response = await self._atimed(name, provider_map[name], prompt, options)
                 if response:
-                    return response
+                    self._report_success(name)
+                    return response, last_error
             except Exception as exc:  # noqa: BLE001
+                self._report_failure(name, exc)
                 last_error = exc
                 continue
+            finally:
+                self.health.release(name)
+        return None, last_error
+
+    def _race(
+        self,
+        provider_chain: list[str],
+        provider_map: dict[str, Callable[..., str | None]],
+        prompt: str,
+        options: dict[str, Any],
+    ) -> tuple[str | None, Exception | None]:
+        queue = list(provider_chain)
+        pending: dict[Future[str | None], str] = {}
+        last_error = None
+
+        def launch() -> None:
+            while queue:
+                name = queue.pop(0)
+                if self.health.acquire(name, provider_chain):
+                    future = self._executor.submit(self._timed, name, provider_map[name], prompt, options)
+                    pending[future] = name
+                    return
+
+        launch()
+        try:
+            while pending:
+                hedge = bool(queue) and len(pending) < self.race_width
+                timeout = self._hedge_delay(next(iter(pending.values()))) if hedge else None
+                done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+                if not done:
+                    launch()
+                    continue
+                for future in done:
+                    name = pending.pop(future)
+                    try:
+                        response = future.result()
+                    except Exception as exc:  # noqa: BLE001
+                        self._report_failure(name, exc)
+                        last_error = exc
+                        continue
+                    finally:
+                        self.health.release(name)
+                    if response:
+                        self._report_success(name)
+                        return response, last_error
+                if queue and len(pending) < self.race_width:
+                    launch()
+        finally:
+            for future, name in pending.items():
+                future.cancel()
+                self.health.release(name)
+        return None, last_error
+
+    async def _arace(
+        self,
+        provider_chain: list[str],
+        provider_map: dict[str, Callable[..., Awaitable[str | None]]],
+        prompt: str,
+        options: dict[str, Any],
+    ) -> tuple[str | None, Exception | None]:
+        queue = list(provider_chain)
+        pending: dict[asyncio.Task[str | None], str] = {}
+        last_error = None
+
+        def launch() -> None:
+            while queue:
+                name = queue.pop(0)
+                if self.health.acquire(name, provider_chain):
+                    task = asyncio.create_task(self._atimed(name, provider_map[name], prompt, options))
+                    pending[task] = name
+                    return
+
+        launch()
+        try:
+            while pending:
+                hedge = bool(queue) and len(pending) < self.race_width
+                timeout = self._hedge_delay(next(iter(pending.values()))) if hedge else None
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    launch()
+                    continue
+                for task in done:
+                    name = pending.pop(task)
+                    try:
+                        response = task.result()
+                    except Exception as exc:  # noqa: BLE001
+                        self._report_failure(name, exc)
+                        last_error = exc
+                        continue
+                    finally:
+                        self.health.release(name)
+                    if response:
+                        self._report_success(name)
+                        return response, last_error
+                if queue and len(pending) < self.race_width:
+                    launch()
+        finally:
+            for task, name in pending.items():
+                task.cancel()
+                self.health.release(name)
+        return None, last_error
+
+    def _report_success(self, provider: str) -> None:
+        self.health.record_success(provider)
+        if provider in REMOTE_PROVIDERS:
+            self.connectivity.report_success()
+
+    def _report_failure(self, provider: str, exc: Exception) -> None:
+        self.health.record_failure(provider)
+        if provider in REMOTE_PROVIDERS and isinstance(exc, NETWORK_ERRORS):
+            self.connectivity.report_failure()
+
+    def _failure_reply(self, last_error: Exception | None) -> str:
         if last_error:
             return (
                 "I'm having trouble reaching the AI provider right now. "
@@ -65,73 +459,282 @@ class LLMRouter:
             )
         return "I'm offline right now. Please try again later."
 
-    def _try_ollama(self, prompt: str, *, system_prompt: str | None = None) -> str | None:
-        url = f"{self.ollama_host}/api/generate"
-        prompt_text = self._build_prompt(prompt, system_prompt)
-        payload = {"model": "llama3.1", "prompt": prompt_text, "stream": False}
-        response = requests.post(url, json=payload, timeout=20)
-        if response.status_code >= 400:
-            return None
-        return response.json().get("response")
+    def _ollama_request(
+        self, prompt: str, system_prompt: str | None, history: list[dict[str, str]] | None, *, stream: bool
+    ) -> dict[str, Any]:
+        history = self._fit_history("ollama", prompt, system_prompt, history)
+        return {
+            "url": f"{self.ollama_host}/api/generate",
+            "json": {
+                "model": "llama3.1",
+                "prompt": self._build_prompt(prompt, system_prompt, history),
+                "stream": stream,
+            },
+        }
 
-    def _try_gemini(self, prompt: str, *, system_prompt: str | None = None) -> str | None:
+    def _gemini_request(
+        self, prompt: str, system_prompt: str | None, history: list[dict[str, str]] | None, *, stream: bool
+    ) -> dict[str, Any] | None:
         if not self.gemini_api_key:
             return None
-        url = "https://generativelanguage.googleapis.com/v1beta/models/gemini-1.5-flash:generateContent"
+        history = self._fit_history("gemini", prompt, system_prompt, history)
+        contents = [
+            {"role": "model" if turn["role"] == "assistant" else "user", "parts": [{"text": turn["content"]}]}
+            for turn in history
+        ]
+        contents.append({"role": "user", "parts": [{"text": self._build_prompt(prompt, system_prompt)}]})
+        base_url = "https://generativelanguage.googleapis.com/v1beta/models/gemini-1.5-flash"
         params = {"key": self.gemini_api_key}
-        payload = {
-            "contents": [{"parts": [{"text": self._build_prompt(prompt, system_prompt)}]}],
-            "generationConfig": {"temperature": 0.6},
+        if stream:
+            params["alt"] = "sse"
+        return {
+            "url": f"{base_url}:streamGenerateContent" if stream else f"{base_url}:generateContent",
+            "params": params,
+            "json": {"contents": contents, "generationConfig": {"temperature": 0.6}},
         }
-        response = requests.post(url, params=params, json=payload, timeout=20)
-        if response.status_code >= 400:
-            return None
-        data = response.json()
-        return data["candidates"][0]["content"]["parts"][0]["text"]
 
-    def _try_openrouter(self, prompt: str, *, system_prompt: str | None = None) -> str | None:
+    def _openrouter_request(
+        self, prompt: str, system_prompt: str | None, history: list[dict[str, str]] | None, *, stream: bool
+    ) -> dict[str, Any] | None:
         if not self.openrouter_api_key:
             return None
-        url = "https://openrouter.ai/api/v1/chat/completions"
-        payload = {
+        history = self._fit_history("openrouter", prompt, system_prompt, history)
+        payload: dict[str, Any] = {
             "model": self.openrouter_model,
             "messages": [
                 {"role": "system", "content": system_prompt or DEFAULT_SYSTEM_PROMPT},
+                *({"role": turn["role"], "content": turn["content"]} for turn in history),
                 {"role": "user", "content": prompt},
             ],
         }
-        headers = {
-            "Authorization": f"Bearer {self.openrouter_api_key}",
-            "Content-Type": "application/json",
+        if stream:
+            payload["stream"] = True
+        return {
+            "url": "https://openrouter.ai/api/v1/chat/completions",
+            "headers": {
+                "Authorization": f"Bearer {self.openrouter_api_key}",
+                "Content-Type": "application/json",
+            },
+            "json": payload,
         }
-        response = requests.post(url, headers=headers, json=payload, timeout=20)
-        if response.status_code >= 400:
-            return None
-        return response.json()["choices"][0]["message"]["content"]
 
-    def _try_huggingface(self, prompt: str, *, system_prompt: str | None = None) -> str | None:
+    def _huggingface_request(
+        self, prompt: str, system_prompt: str | None, history: list[dict[str, str]] | None
+    ) -> dict[str, Any] | None:
         if not self.hf_api_key:
             return None
-        url = f"https://api-inference.huggingface.co/models/{self.hf_model}"
-        headers = {"Authorization": f"Bearer {self.hf_api_key}"}
-        payload = {"inputs": self._build_prompt(prompt, system_prompt)}
-        response = requests.post(url, headers=headers, json=payload, timeout=20)
+        history = self._fit_history("huggingface", prompt, system_prompt, history)
+        return {
+            "url": f"https://api-inference.huggingface.co/models/{self.hf_model}",
+            "headers": {"Authorization": f"Bearer {self.hf_api_key}"},
+            "json": {"inputs": self._build_prompt(prompt, system_prompt, history)},
+        }
+
+    def _try_ollama(
+        self, prompt: str, *, system_prompt: str | None = None, history: list[dict[str, str]] | None = None
+    ) -> str | None:
+        data = self._post_json(self._ollama_request(prompt, system_prompt, history, stream=False))
+        return data.get("response") if data else None
+
+    def _try_gemini(
+        self, prompt: str, *, system_prompt: str | None = None, history: list[dict[str, str]] | None = None
+    ) -> str | None:
+        data = self._post_json(self._gemini_request(prompt, system_prompt, history, stream=False))
+        return self._gemini_text(data) if data else None
+
+    def _try_openrouter(
+        self, prompt: str, *, system_prompt: str | None = None, history: list[dict[str, str]] | None = None
+    ) -> str | None:
+        data = self._post_json(self._openrouter_request(prompt, system_prompt, history, stream=False))
+        return self._openrouter_text(data) if data else None
+
+    def _try_huggingface(
+        self, prompt: str, *, system_prompt: str | None = None, history: list[dict[str, str]] | None = None
+    ) -> str | None:
+        data = self._post_json(self._huggingface_request(prompt, system_prompt, history))
+        return self._huggingface_text(data) if data else None
+
+    def _stream_ollama(
+        self, prompt: str, *, system_prompt: str | None = None, history: list[dict[str, str]] | None = None
+    ) -> Iterator[str]:
+        request = self._ollama_request(prompt, system_prompt, history, stream=True)
+        with self.http.post(**request, stream=True, timeout=PROVIDER_TIMEOUT) as response:
+            self._check_status(response)
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                data = json.loads(line)
+                yield data.get("response", "")
+                if data.get("done"):
+                    return
+
+    def _stream_gemini(
+        self, prompt: str, *, system_prompt: str | None = None, history: list[dict[str, str]] | None = None
+    ) -> Iterator[str]:
+        yield from self._stream_sse(
+            self._gemini_request(prompt, system_prompt, history, stream=True), self._gemini_delta
+        )
+
+    def _stream_openrouter(
+        self, prompt: str, *, system_prompt: str | None = None, history: list[dict[str, str]] | None = None
+    ) -> Iterator[str]:
+        yield from self._stream_sse(
+            self._openrouter_request(prompt, system_prompt, history, stream=True), self._openrouter_delta
+        )
+
+    def _stream_huggingface(
+        self, prompt: str, *, system_prompt: str | None = None, history: list[dict[str, str]] | None = None
+    ) -> Iterator[str]:
+        # The hosted inference API only streams for text-generation-inference models, so
+        # the full completion is relayed as a single chunk.
+        response = self._try_huggingface(prompt, system_prompt=system_prompt, history=history)
+        if response:
+            yield response
+
+    def _post_json(self, request: dict[str, Any] | None) -> Any:
+        if request is None:
+            return None
+        response = self.http.post(**request, timeout=PROVIDER_TIMEOUT)
+        self._check_status(response)
+        return response.json()
+
+    def _stream_sse(
+        self, request: dict[str, Any] | None, delta: Callable[[dict[str, Any]], str]
+    ) -> Iterator[str]:
+        if request is None:
+            return
+        with self.http.post(**request, stream=True, timeout=PROVIDER_TIMEOUT) as response:
+            self._check_status(response)
+            for line in response.iter_lines(decode_unicode=True):
+                payload = self._sse_payload(line)
+                if payload == "[DONE]":
+                    return
+                if payload:
+                    yield delta(json.loads(payload))
+
+    async def _atry_ollama(
+        self, prompt: str, *, system_prompt: str | None = None, history: list[dict[str, str]] | None = None
+    ) -> str | None:
+        data = await self._apost_json(self._ollama_request(prompt, system_prompt, history, stream=False))
+        return data.get("response") if data else None
+
+    async def _atry_gemini(
+        self, prompt: str, *, system_prompt: str | None = None, history: list[dict[str, str]] | None = None
+    ) -> str | None:
+        data = await self._apost_json(self._gemini_request(prompt, system_prompt, history, stream=False))
+        return self._gemini_text(data) if data else None
+
+    async def _atry_openrouter(
+        self, prompt: str, *, system_prompt: str | None = None, history: list[dict[str, str]] | None = None
+    ) -> str | None:
+        data = await self._apost_json(self._openrouter_request(prompt, system_prompt, history, stream=False))
+        return self._openrouter_text(data) if data else None
+
+    async def _atry_huggingface(
+        self, prompt: str, *, system_prompt: str | None = None, history: list[dict[str, str]] | None = None
+    ) -> str | None:
+        data = await self._apost_json(self._huggingface_request(prompt, system_prompt, history))
+        return self._huggingface_text(data) if data else None
+
+    async def _astream_ollama(
+        self, prompt: str, *, system_prompt: str | None = None, history: list[dict[str, str]] | None = None
+    ) -> AsyncIterator[str]:
+        request = self._ollama_request(prompt, system_prompt, history, stream=True)
+        async with self.async_http.stream("POST", **request, timeout=PROVIDER_TIMEOUT) as response:
+            self._check_status(response)
+            async for line in response.aiter_lines():
+                if not line:
+                    continue
+                data = json.loads(line)
+                yield data.get("response", "")
+                if data.get("done"):
+                    return
+
+    async def _astream_gemini(
+        self, prompt: str, *, system_prompt: str | None = None, history: list[dict[str, str]] | None = None
+    ) -> AsyncIterator[str]:
+        request = self._gemini_request(prompt, system_prompt, history, stream=True)
+        async for chunk in self._astream_sse(request, self._gemini_delta):
+            yield chunk
+
+    async def _astream_openrouter(
+        self, prompt: str, *, system_prompt: str | None = None, history: list[dict[str, str]] | None = None
+    ) -> AsyncIterator[str]:
+        request = self._openrouter_request(prompt, system_prompt, history, stream=True)
+        async for chunk in self._astream_sse(request, self._openrouter_delta):
+            yield chunk
+
+    async def _astream_huggingface(
+        self, prompt: str, *, system_prompt: str | None = None, history: list[dict[str, str]] | None = None
+    ) -> AsyncIterator[str]:
+        response = await self._atry_huggingface(prompt, system_prompt=system_prompt, history=history)
+        if response:
+            yield response
+
+    async def _apost_json(self, request: dict[str, Any] | None) -> Any:
+        if request is None:
+            return None
+        response = await self.async_http.post(**request, timeout=PROVIDER_TIMEOUT)
+        self._check_status(response)
+        return response.json()
+
+    async def _astream_sse(
+        self, request: dict[str, Any] | None, delta: Callable[[dict[str, Any]], str]
+    ) -> AsyncIterator[str]:
+        if request is None:
+            return
+        async with self.async_http.stream("POST", **request, timeout=PROVIDER_TIMEOUT) as response:
+            self._check_status(response)
+            async for line in response.aiter_lines():
+                payload = self._sse_payload(line)
+                if payload == "[DONE]":
+                    return
+                if payload:
+                    yield delta(json.loads(payload))
+
+    def _check_status(self, response: requests.Response | httpx.Response) -> None:
         if response.status_code >= 400:
+            endpoint = str(response.url).split("?", 1)[0]
+            raise ProviderError(f"{endpoint} returned HTTP {response.status_code}")
+
+    def _sse_payload(self, line: str) -> str | None:
+        if not line or not line.startswith("data:"):
             return None
-        data = response.json()
+        return line[len("data:"):].strip()
+
+    def _gemini_text(self, data: dict[str, Any]) -> str | None:
+        return data["candidates"][0]["content"]["parts"][0]["text"]
+
+    def _gemini_delta(self, data: dict[str, Any]) -> str:
+        candidates = data.get("candidates") or [{}]
+        parts = (candidates[0].get("content") or {}).get("parts") or [{}]
+        return parts[0].get("text") or ""
+
+    def _openrouter_text(self, data: dict[str, Any]) -> str | None:
+        return data["choices"][0]["message"]["content"]
+
+    def _openrouter_delta(self, data: dict[str, Any]) -> str:
+        choices = data.get("choices") or [{}]
+        return (choices[0].get("delta") or {}).get("content") or ""
+
+    def _huggingface_text(self, data: Any) -> str | None:
         if isinstance(data, list) and data:
             return data[0].get("generated_text")
         if isinstance(data, dict) and "generated_text" in data:
             return data["generated_text"]
         return None
 
-    def _build_prompt(self, prompt: str, system_prompt: str | None) -> str:
+    def _fit_history(
+        self, provider: str, prompt: str, system_prompt: str | None, history: list[dict[str, str]] | None
+    ) -> list[dict[str, str]]:
+        if not history:
+            return []
+        reserved = count_tokens(system_prompt or DEFAULT_SYSTEM_PROMPT, provider) + count_tokens(prompt, provider)
+        return fit_history(history, self.context_budget, provider, reserved)
+
+    def _build_prompt(self, prompt: str, system_prompt: str | None, history: list[dict[str, str]] | None = None) -> str:
         base = system_prompt or DEFAULT_SYSTEM_PROMPT
+        if history:
+            transcript = "\n".join(f"{turn['role'].capitalize()}: {turn['content']}" for turn in history)
+            return f"{base}\n{transcript}\nUser: {prompt}"
         return f"{base}\n{prompt}"
-
-    def _is_online(self) -> bool:
-        try:
-            response = requests.get("https://api.duckduckgo.com/", params={"q": "ping", "format": "json"}, timeout=3)
-            return response.status_code < 400
-        except requests.RequestException:
-            return False
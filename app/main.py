@@ -1,18 +1,43 @@
+import asyncio
 import base64
 import importlib.util
 import json
 import os
 import shutil
-import tempfile
 from datetime import datetime
-from typing import Any
+from typing import Any, AsyncIterator, Iterator
 
-import psutil
-import requests
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
-import subprocess
 
+from app.audio import (
+    decode_audio,
+    encode_wav,
+    piper_sample_rate,
+    stream_piper_cli,
+    synthesize_wav,
+    wav_stream_header,
+)
+from app.cache import get_response_cache
+from app.connectivity import get_connectivity_monitor
+from app.health import get_provider_health
+from app.http_client import get_async_http_client, get_http_client
+from app.intent_classifier import get_intent_classifier
+from app.intents import get_intent_engine
+from app.latency import latency_snapshot
+from app.memory_log import get_memory_log
+from app.memory_search import memory_prompt, search_memory
+from app.memory_writer import get_memory_writer
+from app.piper_worker import get_piper_pool, piper_pool_stats
+from app.search_service import get_search_service
+from app.semantic_cache import get_semantic_cache
+from app.stats_sampler import get_stats_sampler
+from app.timeutil import parse_timestamp
+from app.transcribe_batcher import get_transcription_batcher
+from app.weather_cache import get_weather_cache
+from app.whisper_pool import get_whisper_pool, whisper_pool_stats
 from app.llm import DEFAULT_SYSTEM_PROMPT, LLMRouter
 
 pyautogui = None
@@ -22,55 +47,87 @@ if importlib.util.find_spec("pyautogui") is not None:
 app = FastAPI(title="Jarvis Assistant")
 router = LLMRouter()
 
+WEB_TOOL_KINDS = frozenset({"stats", "weather", "web_search"})
+
 BASE_DIR = os.path.dirname(os.path.dirname(__file__))
 WEB_DIR = os.path.join(BASE_DIR, "web")
 
+@app.on_event("startup")
+async def start_stats_sampler() -> None:
+    get_stats_sampler().start()
+
+
+@app.on_event("startup")
+async def warm_up_models() -> None:
+    if os.getenv("WHISPER_WARMUP") == "1" and importlib.util.find_spec("whisper") is not None:
+        asyncio.get_running_loop().run_in_executor(None, get_whisper_pool().warm_up)
+    asyncio.get_running_loop().run_in_executor(None, get_intent_classifier)
+
+
+@app.on_event("shutdown")
+async def close_http_clients() -> None:
+    await get_async_http_client().aclose()
+
+
+@app.on_event("shutdown")
+async def flush_memory() -> None:
+    await run_in_threadpool(get_memory_writer().close)
+
+
+@app.on_event("shutdown")
+async def stop_stats_sampler() -> None:
+    await run_in_threadpool(get_stats_sampler().stop)
+
+
 app.mount("/", StaticFiles(directory=WEB_DIR, html=True), name="web")
 
 
 def get_stats() -> dict[str, float]:
-    return {
-        "cpu": psutil.cpu_percent(interval=0.2),
-        "ram": psutil.virtual_memory().percent,
-        "disk": psutil.disk_usage("/").percent,
-        "net_sent_mb": round(psutil.net_io_counters().bytes_sent / 1_048_576, 2),
-        "net_recv_mb": round(psutil.net_io_counters().bytes_recv / 1_048_576, 2),
-    }
+    return get_stats_sampler().latest()
 
 
-def fetch_weather(lat: float, lon: float) -> dict[str, Any]:
-    url = (
-        "https://api.open-meteo.com/v1/forecast"
-        f"?latitude={lat}&longitude={lon}"
-        "&current_weather=true"
-    )
-    response = requests.get(url, timeout=10)
-    response.raise_for_status()
-    return response.json()
+async def fetch_weather(lat: float, lon: float) -> dict[str, Any]:
+    return await get_weather_cache().aget(lat, lon)
 
 
-def fetch_search(q: str) -> dict[str, Any]:
+async def fetch_search(q: str) -> dict[str, Any]:
     if not q.strip():
         raise HTTPException(status_code=400, detail="Query is required")
-    response = requests.get(
-        "https://api.duckduckgo.com/",
-        params={"q": q, "format": "json"},
-        timeout=10,
-    )
-    response.raise_for_status()
-    data = response.json()
-    return {
-        "heading": data.get("Heading"),
-        "abstract": data.get("Abstract"),
-        "answer": data.get("Answer"),
-        "related": [item.get("Text") for item in data.get("RelatedTopics", []) if item.get("Text")],
-    }
+    return await get_search_service().asearch(q)
+
 
+def build_system_prompt(persona: str, memories: list[str] | None = None) -> str:
+    prompt = f"{DEFAULT_SYSTEM_PROMPT}\nPersona: {persona}" if persona else DEFAULT_SYSTEM_PROMPT
+    return memory_prompt(prompt, memories or [])
 
-def build_system_prompt(persona: str) -> str:
-    if not persona:
-        return DEFAULT_SYSTEM_PROMPT
-    return f"{DEFAULT_SYSTEM_PROMPT}\nPersona: {persona}"
+
+def recall_memories(memory_root: str | None, message: str, skip: set[str] | None = None) -> list[str]:
+    limit = int(os.getenv("MEMORY_CONTEXT_K", "3"))
+    if not memory_root or limit <= 0:
+        return []
+    try:
+        hits = search_memory(memory_root, message, limit=limit)
+    except Exception:  # noqa: BLE001
+        return []
+    return [f"{hit['role']}: {hit['message']}" for hit in hits if hit["message"] not in (skip or set())]
+
+
+def recent_history(memory_root: str | None) -> list[dict[str, str]]:
+    limit = int(os.getenv("LLM_HISTORY_TURNS", "10"))
+    if not memory_root or limit <= 0:
+        return []
+    entries = get_memory_writer().recent(memory_root, limit)
+    return [
+        {"role": entry["role"], "content": str(entry.get("message", ""))}
+        for entry in entries
+        if entry.get("role") in ("user", "assistant")
+    ]
+
+
+def conversation_context(memory_root: str | None, message: str) -> tuple[list[str], list[dict[str, str]]]:
+    history = recent_history(memory_root)
+    memories = recall_memories(memory_root, message, skip={turn["content"] for turn in history})
+    return memories, history
 
 
 def normalize_memory_path(path: str) -> str:
@@ -78,20 +135,13 @@ def normalize_memory_path(path: str) -> str:
     return os.path.abspath(expanded)
 
 
-def append_memory(path: str, payload: dict[str, Any]) -> None:
-    os.makedirs(path, exist_ok=True)
-    memory_file = os.path.join(path, "jarvis_memory.jsonl")
-    with open(memory_file, "a", encoding="utf-8") as handle:
-        handle.write(json.dumps(payload, ensure_ascii=False) + "\n")
+def append_memory(path: str, *payloads: dict[str, Any]) -> None:
+    get_memory_writer().write(path, list(payloads))
 
 
 def read_memory(path: str, limit: int = 50) -> list[dict[str, Any]]:
-    memory_file = os.path.join(path, "jarvis_memory.jsonl")
-    if not os.path.exists(memory_file):
-        return []
-    with open(memory_file, "r", encoding="utf-8") as handle:
-        lines = handle.readlines()[-limit:]
-    return [json.loads(line) for line in lines if line.strip()]
+    get_memory_writer().flush()
+    return get_memory_log(path).page(limit=limit)["entries"]
 
 
 @app.get("/api/health")
@@ -99,121 +149,233 @@ def health() -> dict[str, str]:
     return {"status": "ok"}
 
 
+@app.get("/api/metrics")
+def metrics() -> dict[str, Any]:
+    semantic_cache = get_semantic_cache()
+    batcher = get_transcription_batcher()
+    intent_classifier = get_intent_classifier()
+    return {
+        "http": get_http_client().pool_stats(),
+        "http_async": get_async_http_client().pool_stats(),
+        "connectivity": get_connectivity_monitor().state(),
+        "provider_latency": latency_snapshot(),
+        "provider_health": get_provider_health().snapshot(),
+        "response_cache": get_response_cache().stats(),
+        "semantic_cache": semantic_cache.stats() if semantic_cache else None,
+        "whisper": whisper_pool_stats(),
+        "transcription_batches": batcher.stats() if batcher else None,
+        "piper": piper_pool_stats(),
+        "memory_writer": get_memory_writer().stats(),
+        "weather_cache": get_weather_cache().stats(),
+        "search_cache": get_search_service().stats(),
+        "intent_classifier": intent_classifier.stats() if intent_classifier else None,
+    }
+
+
 @app.get("/api/stats")
-def stats() -> dict[str, float]:
+async def stats() -> dict[str, float]:
     return get_stats()
 
 
+@app.get("/api/stats/history")
+async def stats_history(seconds: float = 300, points: int = 120) -> dict[str, Any]:
+    sampler = get_stats_sampler()
+    return {
+        "interval": sampler.interval,
+        "samples": sampler.history(seconds=max(1.0, seconds), points=max(1, min(points, 2000))),
+    }
+
+
+@app.websocket("/api/stats/ws")
+async def stats_updates(websocket: WebSocket) -> None:
+    await websocket.accept()
+    sampler = get_stats_sampler()
+    sequence = -1
+    try:
+        while True:
+            if sampler.sequence != sequence:
+                sequence = sampler.sequence
+                await websocket.send_json(sampler.latest())
+            await asyncio.sleep(sampler.interval / 2)
+    except (WebSocketDisconnect, RuntimeError):
+        return
+
+
 @app.get("/api/weather")
-def weather(lat: float, lon: float) -> dict[str, Any]:
-    return fetch_weather(lat, lon)
+async def weather(lat: float, lon: float) -> dict[str, Any]:
+    return await fetch_weather(lat, lon)
 
 
 @app.get("/api/search")
-def search(q: str) -> dict[str, Any]:
-    return fetch_search(q)
+async def search(q: str) -> dict[str, Any]:
+    return await fetch_search(q)
+
+
+def remember_exchange(memory_root: str | None, message: str, reply: str, persona: str) -> None:
+    if not memory_root:
+        return
+    timestamp = datetime.utcnow().isoformat()
+    append_memory(
+        memory_root,
+        {"timestamp": timestamp, "role": "user", "message": message, "persona": persona},
+        {"timestamp": timestamp, "role": "assistant", "message": reply, "persona": persona},
+    )
 
 
-@app.post("/api/chat")
-def chat(payload: dict[str, Any]) -> dict[str, Any]:
+def parse_chat_payload(payload: dict[str, Any]) -> dict[str, Any]:
     message = str(payload.get("message", "")).strip()
     if not message:
         raise HTTPException(status_code=400, detail="message is required")
-    persona = str(payload.get("persona", "")).strip()
-    lat = payload.get("lat")
-    lon = payload.get("lon")
     memory_path = str(payload.get("memory_path", "")).strip()
-    lower_message = message.lower()
-    memory_root = None
-    if memory_path:
-        memory_root = normalize_memory_path(memory_path)
+    return {
+        "message": message,
+        "persona": str(payload.get("persona", "")).strip(),
+        "lat": payload.get("lat"),
+        "lon": payload.get("lon"),
+        "memory_root": normalize_memory_path(memory_path) if memory_path else None,
+        "use_cache": payload.get("cache", True) is not False,
+        "refresh_cache": payload.get("refresh_cache") is True,
+    }
 
-    if "stats" in lower_message or "status" in lower_message:
+
+async def answer_tool_intent(message: str, lat: Any, lon: Any) -> tuple[str, dict[str, Any]] | None:
+    match = get_intent_engine().classify(message, kinds=WEB_TOOL_KINDS)
+    if match is not None:
+        kind, slots = match.kind, match.slots
+    else:
+        classifier = get_intent_classifier()
+        prediction = classifier.route(message, labels=WEB_TOOL_KINDS) if classifier else None
+        if prediction is None:
+            return None
+        if prediction.label == "weather" and (lat is None or lon is None) and "coordinates" not in prediction.slots:
+            return None
+        kind, slots = prediction.label, prediction.slots
+
+    if kind == "stats":
         stats_payload = get_stats()
         reply = (
             "Here are the latest system stats. "
             f"CPU {stats_payload['cpu']}%, RAM {stats_payload['ram']}%, "
             f"Disk {stats_payload['disk']}%."
         )
-        if memory_root:
-            timestamp = datetime.utcnow().isoformat()
-            append_memory(
-                memory_root,
-                {"timestamp": timestamp, "role": "user", "message": message, "persona": persona},
-            )
-            append_memory(
-                memory_root,
-                {"timestamp": timestamp, "role": "assistant", "message": reply, "persona": persona},
-            )
-        return {"reply": reply, "data": {"stats": stats_payload, "persona": persona}}
+        return reply, {"stats": stats_payload}
 
-    if "weather" in lower_message:
+    if kind == "weather":
+        if (lat is None or lon is None) and "coordinates" in slots:
+            lat, lon = slots["coordinates"]
         if lat is None or lon is None:
             raise HTTPException(status_code=400, detail="lat and lon are required for weather")
-        weather_payload = fetch_weather(float(lat), float(lon))
+        weather_payload = await fetch_weather(float(lat), float(lon))
         current = weather_payload.get("current_weather") or {}
         reply = (
             "Here's the current weather. "
             f"Temperature {current.get('temperature')}°C, "
             f"Wind {current.get('windspeed')} km/h."
         )
-        if memory_root:
-            timestamp = datetime.utcnow().isoformat()
-            append_memory(
-                memory_root,
-                {"timestamp": timestamp, "role": "user", "message": message, "persona": persona},
-            )
-            append_memory(
-                memory_root,
-                {"timestamp": timestamp, "role": "assistant", "message": reply, "persona": persona},
-            )
-        return {"reply": reply, "data": {"weather": weather_payload, "persona": persona}}
-
-    if "search" in lower_message:
-        query = message.split("search", 1)[1].strip(" :") if "search" in lower_message else ""
-        query = query or message
-        search_payload = fetch_search(query)
-        summary = search_payload.get("answer") or search_payload.get("abstract") or "I found some results."
-        reply = f"Search results for '{query}': {summary}"
-        if memory_root:
-            timestamp = datetime.utcnow().isoformat()
-            append_memory(
-                memory_root,
-                {"timestamp": timestamp, "role": "user", "message": message, "persona": persona},
-            )
-            append_memory(
-                memory_root,
-                {"timestamp": timestamp, "role": "assistant", "message": reply, "persona": persona},
-            )
-        return {"reply": reply, "data": {"search": search_payload, "persona": persona}}
+        return reply, {"weather": weather_payload}
+
+    query = slots.get("query") or message
+    search_payload = await fetch_search(query)
+    summary = search_payload.get("answer") or search_payload.get("abstract") or "I found some results."
+    reply = f"Search results for '{query}': {summary}"
+    return reply, {"search": search_payload}
+
+
+def sse_event(event: str, data: dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
 
-    system_prompt = build_system_prompt(persona)
+@app.post("/api/chat")
+async def chat(payload: dict[str, Any]) -> dict[str, Any]:
+    request = parse_chat_payload(payload)
+    message = request["message"]
+    persona = request["persona"]
+
+    tool_answer = await answer_tool_intent(message, request["lat"], request["lon"])
+    if tool_answer is not None:
+        reply, data = tool_answer
+        remember_exchange(request["memory_root"], message, reply, persona)
+        return {"reply": reply, "data": {**data, "persona": persona}}
+
+    memories, history = await run_in_threadpool(conversation_context, request["memory_root"], message)
+    system_prompt = build_system_prompt(persona, memories)
     try:
-        reply = router.generate(message, system_prompt=system_prompt, need_reasoning=True)
+        reply = await router.agenerate(
+            message,
+            system_prompt=system_prompt,
+            history=history,
+            need_reasoning=True,
+            use_cache=request["use_cache"],
+            refresh_cache=request["refresh_cache"],
+        )
     except RuntimeError:
         reply = (
             "I'm having trouble reaching the AI provider right now. "
             "Please check your provider settings or try again later."
         )
-    if memory_root:
-        timestamp = datetime.utcnow().isoformat()
-        append_memory(
-            memory_root,
-            {"timestamp": timestamp, "role": "user", "message": message, "persona": persona},
-        )
-        append_memory(
-            memory_root,
-            {"timestamp": timestamp, "role": "assistant", "message": reply, "persona": persona},
-        )
+    remember_exchange(request["memory_root"], message, reply, persona)
     return {"reply": reply, "data": {"persona": persona}}
 
 
+@app.post("/api/chat/stream")
+async def chat_stream(payload: dict[str, Any]) -> StreamingResponse:
+    request = parse_chat_payload(payload)
+    message = request["message"]
+    persona = request["persona"]
+    tool_answer = await answer_tool_intent(message, request["lat"], request["lon"])
+
+    async def events() -> AsyncIterator[str]:
+        if tool_answer is not None:
+            reply, data = tool_answer
+            yield sse_event("token", {"token": reply})
+            remember_exchange(request["memory_root"], message, reply, persona)
+            yield sse_event("done", {"reply": reply, "data": {**data, "persona": persona}})
+            return
+        chunks: list[str] = []
+        memories, history = await run_in_threadpool(conversation_context, request["memory_root"], message)
+        system_prompt = build_system_prompt(persona, memories)
+        async for chunk in router.astream(
+            message,
+            system_prompt=system_prompt,
+            history=history,
+            need_reasoning=True,
+            use_cache=request["use_cache"],
+            refresh_cache=request["refresh_cache"],
+        ):
+            chunks.append(chunk)
+            yield sse_event("token", {"token": chunk})
+        reply = "".join(chunks)
+        remember_exchange(request["memory_root"], message, reply, persona)
+        yield sse_event("done", {"reply": reply, "data": {"persona": persona}})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @app.get("/api/memory")
-def memory(path: str) -> dict[str, Any]:
+def memory(
+    path: str,
+    limit: int = 50,
+    cursor: int | None = None,
+    role: str | None = None,
+    since: str | None = None,
+    until: str | None = None,
+) -> dict[str, Any]:
     if not path.strip():
         raise HTTPException(status_code=400, detail="path is required")
     memory_root = normalize_memory_path(path)
-    return {"path": memory_root, "entries": read_memory(memory_root)}
+    get_memory_writer().flush()
+    page = get_memory_log(memory_root).page(
+        limit=max(1, min(limit, 500)),
+        before=cursor,
+        role=role or None,
+        since=parse_timestamp(since) if since else None,
+        until=parse_timestamp(until) if until else None,
+    )
+    return {"path": memory_root, **page}
 
 
 @app.post("/api/command")
@@ -251,50 +413,100 @@ def command(payload: dict[str, Any]) -> dict[str, Any]:
     raise HTTPException(status_code=400, detail="Unsupported action")
 
 
+async def read_audio_upload(request: Request) -> bytes:
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith("multipart/form-data"):
+        if importlib.util.find_spec("python_multipart") is None and importlib.util.find_spec("multipart") is None:
+            raise HTTPException(
+                status_code=415,
+                detail="Multipart uploads need python-multipart; send raw audio or JSON audio_base64 instead",
+            )
+        form = await request.form()
+        upload = form.get("file")
+        if upload is None or isinstance(upload, str):
+            raise HTTPException(status_code=400, detail="file is required")
+        return await upload.read()
+    if content_type.startswith("application/json"):
+        payload = await request.json()
+        audio_base64 = str(payload.get("audio_base64", "")).strip()
+        if not audio_base64:
+            raise HTTPException(status_code=400, detail="audio_base64 is required")
+        if audio_base64.startswith("data:"):
+            audio_base64 = audio_base64.split(",", 1)[-1]
+        try:
+            return base64.b64decode(audio_base64)
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail="audio_base64 must be valid base64") from exc
+    return await request.body()
+
+
 @app.post("/api/transcribe")
-def transcribe(payload: dict[str, Any]) -> dict[str, str]:
+async def transcribe(request: Request) -> dict[str, str]:
     if importlib.util.find_spec("whisper") is None:
         raise HTTPException(status_code=501, detail="Whisper is not installed")
-    import whisper  # type: ignore
-    audio_base64 = str(payload.get("audio_base64", "")).strip()
-    if not audio_base64:
-        raise HTTPException(status_code=400, detail="audio_base64 is required")
-    if audio_base64.startswith("data:"):
-        audio_base64 = audio_base64.split(",", 1)[-1]
-    filename = str(payload.get("filename", "audio.wav"))
-    suffix = os.path.splitext(filename)[1] or ".wav"
+    audio_bytes = await read_audio_upload(request)
+    if not audio_bytes:
+        raise HTTPException(status_code=400, detail="audio is required")
     try:
-        audio_bytes = base64.b64decode(audio_base64)
+        audio = await run_in_threadpool(decode_audio, audio_bytes)
     except ValueError as exc:
-        raise HTTPException(status_code=400, detail="audio_base64 must be valid base64") from exc
-    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as handle:
-        handle.write(audio_bytes)
-        temp_path = handle.name
-    model = whisper.load_model(os.getenv("WHISPER_MODEL", "base"))
-    result: dict[str, Any] = model.transcribe(temp_path)
-    os.unlink(temp_path)
-    return {"text": result.get("text", "").strip()}
-
-
-@app.post("/api/speak")
-def speak(payload: dict[str, Any]) -> dict[str, str]:
+        raise HTTPException(status_code=400, detail="audio could not be decoded") from exc
+    except RuntimeError as exc:
+        raise HTTPException(status_code=501, detail=str(exc)) from exc
+    batcher = get_transcription_batcher()
+    if batcher is not None:
+        text = await batcher.transcribe(audio)
+    else:
+        result = await run_in_threadpool(get_whisper_pool().transcribe, audio)
+        text = result.get("text", "").strip()
+    return {"text": text}
+
+
+def synthesize_speech(text: str, voice: str) -> bytes:
+    pool = get_piper_pool(voice)
+    if pool is not None:
+        return encode_wav(pool.synthesize(text), pool.sample_rate)
+    return synthesize_wav(text, voice)
+
+
+def parse_speak_payload(payload: dict[str, Any]) -> tuple[str, str]:
     text = str(payload.get("text", "")).strip()
     if not text:
         raise HTTPException(status_code=400, detail="text is required")
     voice = os.getenv("PIPER_VOICE", "en_US-amy-low")
-    if not shutil.which("piper"):
+    if get_piper_pool(voice) is None and not shutil.which("piper"):
         raise HTTPException(status_code=501, detail="piper is not installed")
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as handle:
-        output_path = handle.name
-    process = subprocess.run(
-        ["piper", "--model", voice, "--output_file", output_path],
-        input=text.encode("utf-8"),
-        check=False,
-    )
-    if process.returncode != 0:
-        os.unlink(output_path)
-        raise HTTPException(status_code=500, detail="piper failed to synthesize audio")
-    with open(output_path, "rb") as handle:
-        audio_bytes = handle.read()
-    os.unlink(output_path)
+    return text, voice
+
+
+@app.post("/api/speak", response_model=None)
+async def speak(payload: dict[str, Any], request: Request) -> dict[str, str] | Response:
+    text, voice = parse_speak_payload(payload)
+    try:
+        audio_bytes = await run_in_threadpool(synthesize_speech, text, voice)
+    except RuntimeError as exc:
+        raise HTTPException(status_code=500, detail="piper failed to synthesize audio") from exc
+    if "audio/" in request.headers.get("accept", ""):
+        return Response(content=audio_bytes, media_type="audio/wav")
     return {"audio_base64": base64.b64encode(audio_bytes).decode("utf-8")}
+
+
+@app.post("/api/speak/stream")
+async def speak_stream(payload: dict[str, Any]) -> StreamingResponse:
+    text, voice = parse_speak_payload(payload)
+    pool = get_piper_pool(voice)
+    if pool is not None:
+        try:
+            sample_rate = await run_in_threadpool(lambda: pool.sample_rate)
+        except RuntimeError as exc:
+            raise HTTPException(status_code=500, detail=str(exc)) from exc
+        chunks = pool.stream(text)
+    else:
+        sample_rate = piper_sample_rate(voice)
+        chunks = stream_piper_cli(text, voice)
+
+    def audio() -> Iterator[bytes]:
+        yield wav_stream_header(sample_rate)
+        yield from chunks
+
+    return StreamingResponse(audio(), media_type="audio/wav")
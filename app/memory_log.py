@@ -0,0 +1,261 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, BinaryIO, Iterator
+import json
+import os
+import struct
+import threading
+
+from app.timeutil import parse_timestamp
+
+LOG_NAME = "jarvis_memory.jsonl"
+INDEX_NAME = "jarvis_memory.idx"
+INDEX_HEADER = struct.Struct("<QQ")
+INDEX_RECORD = struct.Struct("<QIdB")
+ROLE_CODES = {"user": 1, "assistant": 2, "system": 3}
+SCAN_BLOCK = 1024
+
+
+class MemoryLog:
+    def __init__(self, root: str, max_entries: int = 10000) -> None:
+        self.root = root
+        self.max_entries = max_entries
+        self.log_path = os.path.join(root, LOG_NAME)
+        self.index_path = os.path.join(root, INDEX_NAME)
+        self._lock = threading.Lock()
+        self._log: BinaryIO | None = None
+        self._index: BinaryIO | None = None
+        self._base = 0
+        self._count = 0
+        self._end = 0
+
+    def append(self, entries: list[dict[str, Any]]) -> None:
+        if not entries:
+            return
+        with self._lock:
+            self._open(create=True)
+            assert self._log is not None and self._index is not None
+            lines = [(json.dumps(entry, ensure_ascii=False) + "\n").encode("utf-8") for entry in entries]
+            records = []
+            offset = self._end
+            for entry, line in zip(entries, lines):
+                records.append(self._record(offset, line, entry))
+                offset += len(line)
+            self._log.seek(0, os.SEEK_END)
+            self._log.write(b"".join(lines))
+            self._log.flush()
+            self._index.seek(INDEX_HEADER.size + self._count * INDEX_RECORD.size)
+            self._index.write(b"".join(records))
+            self._count += len(entries)
+            self._end = offset
+            self._write_header()
+            if self.max_entries and self._count > self.max_entries * 1.25:
+                self._compact()
+
+    def flush(self, sync: bool = False) -> None:
+        with self._lock:
+            for handle in (self._log, self._index):
+                if handle is not None:
+                    handle.flush()
+                    if sync:
+                        os.fsync(handle.fileno())
+
+    def close(self) -> None:
+        with self._lock:
+            for handle in (self._log, self._index):
+                if handle is not None:
+                    handle.close()
+            self._log = None
+            self._index = None
+
+    def page(
+        self,
+        limit: int = 50,
+        before: int | None = None,
+        role: str | None = None,
+        since: float | None = None,
+        until: float | None = None,
+    ) -> dict[str, Any]:
+        with self._lock:
+            if not self._open(create=False):
+                return {"entries": [], "next_cursor": None, "total": 0}
+            assert self._log is not None
+            matches: list[tuple[int, tuple[int, int, float, int], dict[str, Any] | None]] = []
+            more = False
+            for entry_id, record in self._scan_backwards(before):
+                offset, length, timestamp, code = record
+                if since is not None and timestamp < since:
+                    break
+                if until is not None and timestamp > until:
+                    continue
+                if role is not None and code != ROLE_CODES.get(role, 0):
+                    continue
+                entry = None
+                if role is not None and role not in ROLE_CODES:
+                    # Roles without a code share code 0 in the index, so the entry decides before it counts.
+                    self._log.seek(offset)
+                    entry = json.loads(self._log.read(length))
+                    if entry.get("role") != role:
+                        continue
+                if len(matches) == limit:
+                    more = True
+                    break
+                matches.append((entry_id, record, entry))
+            entries = []
+            for entry_id, (offset, length, _timestamp, _code), entry in reversed(matches):
+                if entry is None:
+                    self._log.seek(offset)
+                    entry = json.loads(self._log.read(length))
+                entries.append({"id": entry_id, **entry})
+            return {
+                "entries": entries,
+                "next_cursor": matches[-1][0] if more and matches else None,
+                "total": self._count,
+            }
+
+    def entries_from(self, start: int) -> list[tuple[int, dict[str, Any]]]:
+        with self._lock:
+            if not self._open(create=False):
+                return []
+            assert self._log is not None and self._index is not None
+            first = max(start, self._base) - self._base
+            if first >= self._count:
+                return []
+            self._index.seek(INDEX_HEADER.size + first * INDEX_RECORD.size)
+            records = list(INDEX_RECORD.iter_unpack(self._index.read((self._count - first) * INDEX_RECORD.size)))
+            self._log.seek(records[0][0])
+            data = self._log.read(self._end - records[0][0])
+            first_id = self._base + first
+        base = records[0][0]
+        return [
+            (first_id + position, json.loads(data[offset - base:offset - base + length]))
+            for position, (offset, length, _timestamp, _code) in enumerate(records)
+        ]
+
+    def _scan_backwards(self, before: int | None) -> Iterator[tuple[int, tuple[int, int, float, int]]]:
+        assert self._index is not None
+        stop = self._count if before is None else max(0, min(self._count, before - self._base))
+        while stop > 0:
+            start = max(0, stop - SCAN_BLOCK)
+            self._index.seek(INDEX_HEADER.size + start * INDEX_RECORD.size)
+            block = self._index.read((stop - start) * INDEX_RECORD.size)
+            records = list(INDEX_RECORD.iter_unpack(block))
+            for position in range(len(records) - 1, -1, -1):
+                yield self._base + start + position, records[position]
+            stop = start
+
+    def _record(self, offset: int, line: bytes, entry: dict[str, Any]) -> bytes:
+        code = ROLE_CODES.get(str(entry.get("role", "")), 0)
+        return INDEX_RECORD.pack(offset, len(line), parse_timestamp(entry.get("timestamp")), code)
+
+    def _open(self, create: bool) -> bool:
+        if self._log is not None:
+            return True
+        if not os.path.exists(self.log_path):
+            if not create:
+                return False
+            os.makedirs(self.root, exist_ok=True)
+            open(self.log_path, "ab").close()
+        self._log = open(self.log_path, "r+b")
+        index_exists = os.path.exists(self.index_path)
+        self._index = open(self.index_path, "r+b" if index_exists else "w+b")
+        header = self._index.read(INDEX_HEADER.size)
+        size = os.path.getsize(self.log_path)
+        if len(header) == INDEX_HEADER.size:
+            self._base, self._end = INDEX_HEADER.unpack(header)
+            index_size = os.path.getsize(self.index_path) - INDEX_HEADER.size
+            self._count = index_size // INDEX_RECORD.size
+        if len(header) != INDEX_HEADER.size or self._end > size:
+            self._rebuild(base=0)
+        elif self._end < size:
+            self._index_tail()
+        return True
+
+    def _rebuild(self, base: int) -> None:
+        assert self._index is not None
+        self._base = base
+        self._count = 0
+        self._end = 0
+        self._index.seek(0)
+        self._index.truncate()
+        self._index_tail()
+
+    def _index_tail(self) -> None:
+        # Lines appended by another writer (or an older version without an index) are indexed on open.
+        assert self._log is not None and self._index is not None
+        self._log.seek(self._end)
+        self._index.seek(INDEX_HEADER.size + self._count * INDEX_RECORD.size)
+        self._index.truncate()
+        offset = self._end
+        for line in self._log:
+            if not line.endswith(b"\n"):
+                break
+            if line.strip():
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    entry = {}
+                self._index.write(self._record(offset, line, entry))
+                self._count += 1
+            offset += len(line)
+        self._end = offset
+        self._write_header()
+
+    def _write_header(self) -> None:
+        assert self._index is not None
+        self._index.seek(0)
+        self._index.write(INDEX_HEADER.pack(self._base, self._end))
+        self._index.flush()
+
+    def _compact(self) -> None:
+        # Entries beyond max_entries are rotated into a dated archive file; ids keep counting from
+        # the new base so existing cursors stay valid.
+        assert self._log is not None and self._index is not None
+        drop = self._count - self.max_entries
+        self._index.seek(INDEX_HEADER.size + drop * INDEX_RECORD.size)
+        (cut, _length, _timestamp, _code) = INDEX_RECORD.unpack(self._index.read(INDEX_RECORD.size))
+        self._log.seek(0)
+        archived = self._log.read(cut)
+        kept = self._log.read()
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%d%H%M%S%f")
+        with open(os.path.join(self.root, f"jarvis_memory-{stamp}.jsonl"), "wb") as archive:
+            archive.write(archived)
+        temp_path = f"{self.log_path}.tmp"
+        with open(temp_path, "wb") as handle:
+            handle.write(kept)
+        self._log.close()
+        os.replace(temp_path, self.log_path)
+        self._log = open(self.log_path, "r+b")
+        self._rebuild(base=self._base + drop)
+
+
+_logs: OrderedDict[str, MemoryLog] = OrderedDict()
+_logs_lock = threading.Lock()
+
+
+def normalize_root(root: str) -> str:
+    return os.path.realpath(os.path.expanduser(root))
+
+
+def open_roots_limit() -> int:
+    return max(1, int(os.getenv("MEMORY_MAX_OPEN_ROOTS", "8")))
+
+
+def get_memory_log(root: str) -> MemoryLog:
+    # Roots come from clients, so only the most recently used few keep open handles.
+    root = normalize_root(root)
+    evicted = []
+    with _logs_lock:
+        log = _logs.get(root)
+        if log is None:
+            log = MemoryLog(root, max_entries=int(os.getenv("MEMORY_MAX_ENTRIES", "10000")))
+            _logs[root] = log
+            while len(_logs) > open_roots_limit():
+                evicted.append(_logs.popitem(last=False)[1])
+        else:
+            _logs.move_to_end(root)
+    for stale in evicted:
+        stale.close()
+    return log
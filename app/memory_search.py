@@ -0,0 +1,226 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import Any, Iterable
+import importlib.util
+import os
+import re
+import sqlite3
+import threading
+
+from app.memory_log import get_memory_log, normalize_root, open_roots_limit
+from app.semantic_cache import STOPWORDS, HashedNgramEmbedder, SentenceEmbedder
+
+np = None
+if importlib.util.find_spec("numpy") is not None:
+    import numpy as np  # type: ignore
+
+SEARCH_DB_NAME = "jarvis_memory_search.sqlite3"
+RRF_K = 60
+
+
+def fts5_available() -> bool:
+    try:
+        conn = sqlite3.connect(":memory:")
+        conn.execute("CREATE VIRTUAL TABLE probe USING fts5(content)")
+        conn.close()
+    except sqlite3.OperationalError:
+        return False
+    return True
+
+
+FTS5_AVAILABLE = fts5_available()
+
+
+def query_terms(text: str) -> list[str]:
+    return [word for word in re.findall(r"\w+", text.lower()) if word not in STOPWORDS and len(word) > 1]
+
+
+def rank_text(conn: sqlite3.Connection, query: str, limit: int, table: str, fts: bool) -> list[int]:
+    terms = query_terms(query)
+    if not terms:
+        return []
+    if fts:
+        match = " OR ".join(f'"{term}"' for term in dict.fromkeys(terms))
+        rows = conn.execute(
+            f"SELECT rowid FROM {table} WHERE {table} MATCH ? ORDER BY rank LIMIT ?", (match, limit)
+        ).fetchall()
+    else:
+        term = max(terms, key=len)
+        rows = conn.execute(
+            f"SELECT rowid FROM {table} WHERE content LIKE ? ORDER BY rowid DESC LIMIT ?", (f"%{term}%", limit)
+        ).fetchall()
+    return [row[0] for row in rows]
+
+
+def memory_prompt(system_prompt: str, memories: list[str], max_chars: int = 300) -> str:
+    if not memories:
+        return system_prompt
+    lines = "\n".join(f"- {' '.join(memory.split())[:max_chars]}" for memory in memories)
+    return f"{system_prompt}\nRelevant memories from earlier conversations:\n{lines}"
+
+
+def fuse(rankings: Iterable[list[int]], limit: int) -> list[int]:
+    scores: dict[int, float] = {}
+    for ranking in rankings:
+        for rank, item_id in enumerate(ranking):
+            scores[item_id] = scores.get(item_id, 0.0) + 1.0 / (RRF_K + rank + 1)
+    return sorted(scores, key=scores.__getitem__, reverse=True)[:limit]
+
+
+class VectorIndex:
+    def __init__(self, embedder: Any, min_score: float = 0.5) -> None:
+        self.embedder = embedder
+        self.min_score = min_score
+        self.max_id = -1
+        self._ids = np.zeros(0, dtype=np.int64)
+        self._vectors = np.zeros((0, embedder.dim), dtype=np.float32)
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def sync(self, rows: Iterable[tuple[int, str]]) -> None:
+        with self._lock:
+            for item_id, text in rows:
+                vector = self._normalize(self.embedder.embed(text))
+                self.max_id = max(self.max_id, int(item_id))
+                if vector is None:
+                    continue
+                if self._size == len(self._ids):
+                    capacity = max(1024, self._size * 2)
+                    self._ids = np.resize(self._ids, capacity)
+                    vectors = np.zeros((capacity, self._vectors.shape[1]), dtype=np.float32)
+                    vectors[: self._size] = self._vectors[: self._size]
+                    self._vectors = vectors
+                self._ids[self._size] = item_id
+                self._vectors[self._size] = vector
+                self._size += 1
+
+    def search(self, query: str, limit: int) -> list[int]:
+        vector = self._normalize(self.embedder.embed(query))
+        with self._lock:
+            if vector is None or not self._size:
+                return []
+            scores = self._vectors[: self._size] @ vector
+            count = min(limit, self._size)
+            top = np.argpartition(scores, -count)[-count:]
+            top = top[np.argsort(scores[top])[::-1]]
+            return [int(self._ids[index]) for index in top if scores[index] >= self.min_score]
+
+    def _normalize(self, vector: Any) -> Any:
+        norm = float(np.linalg.norm(vector))
+        if not norm:
+            return None
+        return vector / norm
+
+
+def create_vector_index() -> VectorIndex | None:
+    if os.getenv("MEMORY_VECTOR_SEARCH", "0") != "1" or np is None:
+        return None
+    model_name = os.getenv("MEMORY_EMBED_MODEL")
+    if model_name and importlib.util.find_spec("sentence_transformers") is not None:
+        embedder: Any = SentenceEmbedder(model_name)
+    else:
+        embedder = HashedNgramEmbedder(dim=256)
+    return VectorIndex(embedder, min_score=float(os.getenv("MEMORY_VECTOR_MIN_SCORE", "0.5")))
+
+
+class MemorySearchIndex:
+    def __init__(self, root: str) -> None:
+        self.root = root
+        self._lock = threading.Lock()
+        self._conn = self._connect()
+        self._vectors = create_vector_index()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+            self._closed = True
+
+    def _connect(self) -> sqlite3.Connection:
+        self._closed = False
+        conn = sqlite3.connect(os.path.join(self.root, SEARCH_DB_NAME), check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        if FTS5_AVAILABLE:
+            conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS memory_text USING fts5(content, role UNINDEXED, timestamp UNINDEXED)"
+            )
+        else:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS memory_text (id INTEGER PRIMARY KEY, content TEXT, role TEXT, timestamp TEXT)"
+            )
+        conn.commit()
+        return conn
+
+    def _db(self) -> sqlite3.Connection:
+        # An index evicted from the cache while still in use reconnects instead of failing.
+        if self._closed:
+            self._conn = self._connect()
+        return self._conn
+
+    @property
+    def max_id(self) -> int:
+        with self._lock:
+            row = self._db().execute("SELECT MAX(rowid) FROM memory_text").fetchone()
+        return -1 if row[0] is None else int(row[0])
+
+    def add(self, items: Iterable[tuple[int, dict[str, Any]]]) -> None:
+        rows = [
+            (item_id, str(entry.get("message", "")), str(entry.get("role", "")), str(entry.get("timestamp", "")))
+            for item_id, entry in items
+        ]
+        with self._lock:
+            conn = self._db()
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO memory_text (rowid, content, role, timestamp) VALUES (?, ?, ?, ?)", rows
+                )
+
+    def search(self, query: str, limit: int = 5) -> list[dict[str, Any]]:
+        with self._lock:
+            conn = self._db()
+            rankings = [rank_text(conn, query, limit * 4, "memory_text", FTS5_AVAILABLE)]
+            if self._vectors is not None:
+                self._vectors.sync(
+                    conn.execute(
+                        "SELECT rowid, content FROM memory_text WHERE rowid > ? ORDER BY rowid", (self._vectors.max_id,)
+                    )
+                )
+                rankings.append(self._vectors.search(query, limit * 4))
+            ids = fuse(rankings, limit)
+            if not ids:
+                return []
+            placeholders = ",".join("?" for _ in ids)
+            rows = conn.execute(
+                f"SELECT rowid, content, role, timestamp FROM memory_text WHERE rowid IN ({placeholders})", ids
+            ).fetchall()
+        found = {row[0]: {"id": row[0], "message": row[1], "role": row[2], "timestamp": row[3]} for row in rows}
+        return [found[item_id] for item_id in ids if item_id in found]
+
+
+_indexes: OrderedDict[str, MemorySearchIndex] = OrderedDict()
+_indexes_lock = threading.Lock()
+
+
+def get_memory_search_index(root: str) -> MemorySearchIndex:
+    root = normalize_root(root)
+    evicted = []
+    with _indexes_lock:
+        index = _indexes.get(root)
+        if index is None:
+            os.makedirs(root, exist_ok=True)
+            index = MemorySearchIndex(root)
+            _indexes[root] = index
+            while len(_indexes) > open_roots_limit():
+                evicted.append(_indexes.popitem(last=False)[1])
+        else:
+            _indexes.move_to_end(root)
+    for stale in evicted:
+        stale.close()
+    return index
+
+
+def search_memory(root: str, query: str, limit: int = 5) -> list[dict[str, Any]]:
+    index = get_memory_search_index(root)
+    index.add(get_memory_log(root).entries_from(index.max_id + 1))
+    return index.search(query, limit)
@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+from typing import Any
+import os
+import queue
+import threading
+import time
+
+from app.memory_log import get_memory_log, normalize_root
+
+
+class MemoryWriter:
+    def __init__(self, batch_size: int = 64, interval: float = 0.5, fsync: str = "off") -> None:
+        self.batch_size = max(1, batch_size)
+        self.interval = interval
+        self.fsync = fsync
+        self._queue: queue.Queue[tuple[str, list[dict[str, Any]]] | threading.Event | None] = queue.Queue()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+        # Entries queued but not yet appended, per root, so readers can see them without a flush.
+        self._unwritten: dict[str, list[dict[str, Any]]] = {}
+        self._write_lock = threading.Lock()
+        self._stats = {"entries": 0, "flushes": 0, "errors": 0}
+
+    def write(self, root: str, entries: list[dict[str, Any]]) -> None:
+        root = normalize_root(root)
+        self._ensure_started()
+        with self._write_lock:
+            self._unwritten.setdefault(root, []).extend(entries)
+        self._queue.put((root, entries))
+
+    def recent(self, root: str, limit: int) -> list[dict[str, Any]]:
+        # The newest `limit` entries of the log plus those still queued for it. Holding the write lock
+        # waits at most for one append in progress, never for a flush interval.
+        root = normalize_root(root)
+        with self._write_lock:
+            entries = get_memory_log(root).page(limit=limit)["entries"]
+            entries.extend(self._unwritten.get(root, ()))
+        return entries[-limit:]
+
+    def flush(self, timeout: float | None = 5.0) -> None:
+        if self._thread is None:
+            return
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait(timeout)
+
+    def close(self) -> None:
+        with self._lock:
+            thread = self._thread
+            self._thread = None
+        if thread is None:
+            return
+        self._queue.put(None)
+        thread.join()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            stats: dict[str, Any] = dict(self._stats)
+        stats["queued"] = self._queue.qsize()
+        stats["batch_size"] = self.batch_size
+        stats["interval"] = self.interval
+        stats["fsync"] = self.fsync
+        return stats
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="memory-writer", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        # Entries are grouped per memory root and written once the batch is full or the oldest
+        # pending entry has waited `interval` seconds.
+        pending: dict[str, list[dict[str, Any]]] = {}
+        count = 0
+        deadline = 0.0
+        while True:
+            timeout = max(0.0, deadline - time.monotonic()) if pending else None
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = threading.Event()
+            if isinstance(item, tuple):
+                root, entries = item
+                if not pending:
+                    deadline = time.monotonic() + self.interval
+                pending.setdefault(root, []).extend(entries)
+                count += len(entries)
+                if count < self.batch_size:
+                    continue
+            self._write(pending)
+            pending = {}
+            count = 0
+            if item is None:
+                return
+            if isinstance(item, threading.Event):
+                item.set()
+
+    def _write(self, pending: dict[str, list[dict[str, Any]]]) -> None:
+        for root, entries in pending.items():
+            try:
+                log = get_memory_log(root)
+                with self._write_lock:
+                    try:
+                        log.append(entries)
+                    finally:
+                        self._forget(root, len(entries))
+                if self.fsync == "batch":
+                    log.flush(sync=True)
+                with self._lock:
+                    self._stats["entries"] += len(entries)
+                    self._stats["flushes"] += 1
+            except Exception:  # noqa: BLE001
+                with self._lock:
+                    self._stats["errors"] += 1
+
+    def _forget(self, root: str, count: int) -> None:
+        unwritten = self._unwritten.get(root, [])
+        del unwritten[:count]
+        if not unwritten:
+            self._unwritten.pop(root, None)
+
+
+_writer: MemoryWriter | None = None
+_writer_lock = threading.Lock()
+
+
+def get_memory_writer() -> MemoryWriter:
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = MemoryWriter(
+                    batch_size=int(os.getenv("MEMORY_FLUSH_SIZE", "64")),
+                    interval=float(os.getenv("MEMORY_FLUSH_INTERVAL", "0.5")),
+                    fsync=os.getenv("MEMORY_FSYNC", "off"),
+                )
+    return _writer
@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+from typing import Any, BinaryIO, Iterator
+import importlib.util
+import json
+import os
+import queue
+import struct
+import subprocess
+import sys
+import threading
+
+BASE_DIR = os.path.dirname(os.path.dirname(__file__))
+ERROR_FRAME = 0xFFFFFFFF
+
+
+def is_piper_module_available() -> bool:
+    return importlib.util.find_spec("piper") is not None
+
+
+def load_voice(voice: str) -> Any:
+    piper = __import__("piper")
+    model_path = voice if voice.endswith(".onnx") or not os.path.exists(f"{voice}.onnx") else f"{voice}.onnx"
+    return piper.PiperVoice.load(model_path)
+
+
+def synthesize_pcm(voice: Any, text: str) -> Iterator[bytes]:
+    if hasattr(voice, "synthesize_stream_raw"):
+        yield from voice.synthesize_stream_raw(text)
+        return
+    for chunk in voice.synthesize(text):
+        yield chunk.audio_int16_bytes
+
+
+def serve(voice_name: str, reader: BinaryIO, writer: BinaryIO) -> None:
+    voice = load_voice(voice_name)
+    writer.write(struct.pack(">I", int(voice.config.sample_rate)))
+    writer.flush()
+    for line in reader:
+        if not line.strip():
+            continue
+        try:
+            for pcm in synthesize_pcm(voice, json.loads(line)["text"]):
+                if pcm:
+                    writer.write(struct.pack(">I", len(pcm)) + pcm)
+                    writer.flush()
+        except Exception:  # noqa: BLE001
+            writer.write(struct.pack(">I", ERROR_FRAME))
+        writer.write(struct.pack(">I", 0))
+        writer.flush()
+
+
+class PiperWorker:
+    def __init__(self, voice: str) -> None:
+        self.voice = voice
+        self.sample_rate: int | None = None
+        self.crashes = 0
+        self._process: subprocess.Popen[bytes] | None = None
+
+    def start(self) -> None:
+        if self._process is not None and self._process.poll() is None:
+            return
+        if self._process is not None:
+            self.crashes += 1
+        self._process = subprocess.Popen(
+            [sys.executable, "-m", "app.piper_worker", self.voice],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            cwd=BASE_DIR,
+        )
+        try:
+            (self.sample_rate,) = struct.unpack(">I", self._read_exact(4))
+        except EOFError:
+            self.stop()
+            raise RuntimeError("piper worker failed to load the voice") from None
+
+    def stop(self) -> None:
+        if self._process is None:
+            return
+        self._process.kill()
+        self._process.wait()
+        self._process = None
+
+    def synthesize(self, text: str) -> Iterator[bytes]:
+        self.start()
+        finished = False
+        try:
+            request = json.dumps({"text": " ".join(text.split())}) + "\n"
+            assert self._process is not None and self._process.stdin is not None
+            self._process.stdin.write(request.encode("utf-8"))
+            self._process.stdin.flush()
+            while True:
+                frame = self._read_frame()
+                if frame is None:
+                    finished = True
+                    return
+                yield frame
+        except RuntimeError:
+            finished = True
+            raise
+        except (OSError, EOFError) as exc:
+            finished = True
+            self.crashes += 1
+            self.stop()
+            raise RuntimeError("piper worker crashed") from exc
+        finally:
+            if not finished:
+                self._drain()
+
+    def _drain(self) -> None:
+        try:
+            while self._read_frame() is not None:
+                pass
+        except (OSError, EOFError, RuntimeError):
+            self.stop()
+
+    def _read_frame(self) -> bytes | None:
+        (length,) = struct.unpack(">I", self._read_exact(4))
+        if length == 0:
+            return None
+        if length == ERROR_FRAME:
+            while self._read_exact(4) != b"\x00\x00\x00\x00":
+                pass
+            raise RuntimeError("piper failed to synthesize audio")
+        return self._read_exact(length)
+
+    def _read_exact(self, size: int) -> bytes:
+        assert self._process is not None and self._process.stdout is not None
+        data = self._process.stdout.read(size)
+        if len(data) != size:
+            raise EOFError("piper worker closed its output")
+        return data
+
+
+class PiperWorkerPool:
+    def __init__(self, voice: str, size: int = 1) -> None:
+        self.voice = voice
+        self.size = max(1, size)
+        self._workers = [PiperWorker(voice) for _ in range(self.size)]
+        self._idle: queue.Queue[PiperWorker] = queue.Queue()
+        for worker in self._workers:
+            self._idle.put(worker)
+
+    @property
+    def sample_rate(self) -> int:
+        worker = self._idle.get()
+        try:
+            worker.start()
+            assert worker.sample_rate is not None
+            return worker.sample_rate
+        finally:
+            self._idle.put(worker)
+
+    def stream(self, text: str) -> Iterator[bytes]:
+        worker = self._idle.get()
+        try:
+            yield from worker.synthesize(text)
+        finally:
+            self._idle.put(worker)
+
+    def synthesize(self, text: str) -> bytes:
+        return b"".join(self.stream(text))
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "voice": self.voice,
+            "workers": self.size,
+            "idle": self._idle.qsize(),
+            "running": sum(1 for worker in self._workers if worker._process is not None),
+            "crashes": sum(worker.crashes for worker in self._workers),
+        }
+
+
+_pools: dict[str, PiperWorkerPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_piper_pool(voice: str) -> PiperWorkerPool | None:
+    if not is_piper_module_available():
+        return None
+    with _pools_lock:
+        pool = _pools.get(voice)
+        if pool is None:
+            pool = PiperWorkerPool(voice, size=int(os.getenv("PIPER_WORKERS", "1")))
+            _pools[voice] = pool
+    return pool
+
+
+def piper_pool_stats() -> list[dict[str, Any]]:
+    with _pools_lock:
+        pools = list(_pools.values())
+    return [pool.stats() for pool in pools]
+
+
+if __name__ == "__main__":
+    frames = os.fdopen(os.dup(sys.stdout.fileno()), "wb")
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    serve(sys.argv[1], sys.stdin.buffer, frames)
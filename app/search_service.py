@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any
+import asyncio
+import os
+import threading
+import time
+
+from app.cache import normalize_prompt
+from app.http_client import get_async_http_client, get_http_client
+
+SEARCH_URL = "https://api.duckduckgo.com/"
+QUERY_SUFFIXES = {"web": "", "news": " news", "price": " price"}
+
+Key = tuple[str, str]
+
+
+def normalize_query(query: str) -> str:
+    return normalize_prompt(query).strip(" ?!.,:;\"'")
+
+
+def parse_results(data: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "heading": data.get("Heading"),
+        "abstract": data.get("Abstract"),
+        "answer": data.get("Answer"),
+        "related": [item.get("Text") for item in data.get("RelatedTopics", []) if item.get("Text")],
+    }
+
+
+def is_empty(results: dict[str, Any]) -> bool:
+    return not any(results.get(field) for field in ("heading", "abstract", "answer", "related"))
+
+
+class SearchService:
+    def __init__(
+        self,
+        ttls: dict[str, float] | None = None,
+        negative_ttl: float = 120.0,
+        max_entries: int = 1024,
+    ) -> None:
+        self.ttls = {"web": 21600.0, "news": 300.0, "price": 60.0, **(ttls or {})}
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self._entries: OrderedDict[Key, tuple[float, dict[str, Any]]] = OrderedDict()
+        self._inflight: dict[Key, Future[dict[str, Any]]] = {}
+        self._tasks: set[asyncio.Task[None]] = set()
+        self._lock = threading.Lock()
+        self._stats = {
+            "hits": 0,
+            "negative_hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "fetches": 0,
+            "errors": 0,
+            "evictions": 0,
+        }
+
+    def search(self, query: str, kind: str = "web") -> dict[str, Any]:
+        key = self._key(query, kind)
+        cached, future, leader = self._lookup(key)
+        if cached is not None:
+            return cached
+        assert future is not None
+        if leader:
+            try:
+                response = get_http_client().get(SEARCH_URL, params=self._params(key))
+                response.raise_for_status()
+                results = parse_results(response.json())
+            except BaseException as exc:
+                self._fail(key, future, exc)
+                raise
+            self._store(key, future, results)
+        return future.result()
+
+    async def asearch(self, query: str, kind: str = "web") -> dict[str, Any]:
+        key = self._key(query, kind)
+        cached, future, leader = self._lookup(key)
+        if cached is not None:
+            return cached
+        assert future is not None
+        if leader:
+            task = asyncio.create_task(self._afetch(key, future))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        # Each waiter shields its own view of the shared future, so a cancelled caller cannot cancel it
+        # for the others coalesced onto the same fetch.
+        return await asyncio.shield(asyncio.wrap_future(future))
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {**self._stats, "entries": len(self._entries), "inflight": len(self._inflight)}
+
+    def _key(self, query: str, kind: str) -> Key:
+        if kind not in QUERY_SUFFIXES:
+            raise ValueError(f"Unknown search kind: {kind}")
+        return kind, normalize_query(query)
+
+    def _params(self, key: Key) -> dict[str, Any]:
+        kind, query = key
+        return {"q": f"{query}{QUERY_SUFFIXES[kind]}", "format": "json"}
+
+    def _lookup(self, key: Key) -> tuple[dict[str, Any] | None, Future[dict[str, Any]] | None, bool]:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, results = entry
+                if now < expires_at:
+                    self._entries.move_to_end(key)
+                    self._stats["negative_hits" if is_empty(results) else "hits"] += 1
+                    return results, None, False
+                del self._entries[key]
+            pending = self._inflight.get(key)
+            if pending is not None:
+                self._stats["coalesced"] += 1
+                return None, pending, False
+            self._stats["misses"] += 1
+            future: Future[dict[str, Any]] = Future()
+            self._inflight[key] = future
+            return None, future, True
+
+    async def _afetch(self, key: Key, future: Future[dict[str, Any]]) -> None:
+        try:
+            response = await get_async_http_client().get(SEARCH_URL, params=self._params(key))
+            response.raise_for_status()
+            results = parse_results(response.json())
+        except BaseException as exc:
+            self._fail(key, future, exc)
+            return
+        self._store(key, future, results)
+
+    def _store(self, key: Key, future: Future[dict[str, Any]], results: dict[str, Any]) -> None:
+        # Empty answers are cached too, but only briefly, so repeated misses don't hit the API each time.
+        ttl = self.negative_ttl if is_empty(results) else self.ttls[key[0]]
+        with self._lock:
+            self._inflight.pop(key, None)
+            self._stats["fetches"] += 1
+            if ttl > 0 and self.max_entries > 0:
+                self._entries[key] = (time.time() + ttl, results)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self._stats["evictions"] += 1
+        if not future.done():
+            future.set_result(results)
+
+    def _fail(self, key: Key, future: Future[dict[str, Any]], exc: BaseException) -> None:
+        with self._lock:
+            self._inflight.pop(key, None)
+            self._stats["errors"] += 1
+        if not future.done():
+            future.set_exception(exc)
+
+
+_service: SearchService | None = None
+_service_lock = threading.Lock()
+
+
+def get_search_service() -> SearchService:
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = SearchService(
+                    ttls={
+                        "web": float(os.getenv("SEARCH_TTL_WEB", "21600")),
+                        "news": float(os.getenv("SEARCH_TTL_NEWS", "300")),
+                        "price": float(os.getenv("SEARCH_TTL_PRICE", "60")),
+                    },
+                    negative_ttl=float(os.getenv("SEARCH_NEGATIVE_TTL", "120")),
+                    max_entries=int(os.getenv("SEARCH_CACHE_SIZE", "1024")),
+                )
+    return _service
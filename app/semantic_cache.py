@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+from typing import Any
+import importlib.util
+import os
+import re
+import threading
+import zlib
+
+np = None
+if importlib.util.find_spec("numpy") is not None:
+    import numpy as np  # type: ignore
+
+STOPWORDS = frozenset(
+    "a an and are can could do does for how i in is it me my of on please s tell the to what whats "
+    "which who why would you your".split()
+)
+
+
+class HashedNgramEmbedder:
+    def __init__(self, dim: int = 512, ngram: int = 3) -> None:
+        self.dim = dim
+        self.ngram = ngram
+
+    def embed(self, text: str) -> Any:
+        words = [word for word in re.sub(r"[^a-z0-9]+", " ", text.lower()).split() if word not in STOPWORDS]
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for word in words:
+            vector[zlib.crc32(f"w:{word}".encode("utf-8")) % self.dim] += 1.0
+            padded = f" {word} "
+            for start in range(max(len(padded) - self.ngram + 1, 1)):
+                gram = padded[start:start + self.ngram]
+                vector[zlib.crc32(gram.encode("utf-8")) % self.dim] += 0.5
+        np.log1p(vector, out=vector)
+        return vector
+
+
+class SentenceEmbedder:
+    def __init__(self, model_name: str) -> None:
+        sentence_transformers = __import__("sentence_transformers")
+        self.model = sentence_transformers.SentenceTransformer(model_name, device="cpu")
+        self.dim = int(self.model.get_sentence_embedding_dimension())
+
+    def embed(self, text: str) -> Any:
+        return np.asarray(self.model.encode(text), dtype=np.float32)
+
+
+class SemanticCache:
+    def __init__(self, embedder: Any, capacity: int = 1024, threshold: float = 0.92) -> None:
+        self.embedder = embedder
+        self.capacity = capacity
+        self.threshold = threshold
+        self._vectors = np.zeros((capacity, embedder.dim), dtype=np.float32)
+        self._scopes = np.zeros(capacity, dtype=np.int64)
+        self._last_used = np.zeros(capacity, dtype=np.int64)
+        self._answers: list[str | None] = [None] * capacity
+        self._size = 0
+        self._clock = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+    def get(self, prompt: str, scope: str) -> str | None:
+        query = self._normalize(self.embedder.embed(prompt))
+        if query is None:
+            return None
+        with self._lock:
+            if self._size:
+                scores = self._vectors[: self._size] @ query
+                scores[self._scopes[: self._size] != self._scope_id(scope)] = -1.0
+                best = int(np.argmax(scores))
+                if scores[best] >= self.threshold:
+                    self._clock += 1
+                    self._last_used[best] = self._clock
+                    self._stats["hits"] += 1
+                    return self._answers[best]
+            self._stats["misses"] += 1
+            return None
+
+    def set(self, prompt: str, scope: str, answer: str) -> None:
+        vector = self._normalize(self.embedder.embed(prompt))
+        if vector is None:
+            return
+        with self._lock:
+            if self._size < self.capacity:
+                slot = self._size
+                self._size += 1
+            else:
+                slot = int(np.argmin(self._last_used))
+                self._stats["evictions"] += 1
+            self._clock += 1
+            self._vectors[slot] = vector
+            self._scopes[slot] = self._scope_id(scope)
+            self._last_used[slot] = self._clock
+            self._answers[slot] = answer
+            self._stats["stores"] += 1
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            stats: dict[str, Any] = dict(self._stats)
+            stats["entries"] = self._size
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 3) if lookups else None
+        stats["capacity"] = self.capacity
+        stats["threshold"] = self.threshold
+        stats["embedder"] = type(self.embedder).__name__
+        stats["memory_bytes"] = int(self._vectors.nbytes + self._scopes.nbytes + self._last_used.nbytes)
+        return stats
+
+    def _normalize(self, vector: Any) -> Any:
+        norm = float(np.linalg.norm(vector))
+        if not norm:
+            return None
+        return vector / norm
+
+    def _scope_id(self, scope: str) -> int:
+        return zlib.crc32(scope.encode("utf-8"))
+
+
+_semantic_cache: SemanticCache | None = None
+_semantic_cache_lock = threading.Lock()
+
+
+def get_semantic_cache() -> SemanticCache | None:
+    global _semantic_cache
+    if os.getenv("SEMANTIC_CACHE", "0") != "1" or np is None:
+        return None
+    if _semantic_cache is None:
+        with _semantic_cache_lock:
+            if _semantic_cache is None:
+                model_name = os.getenv("SEMANTIC_CACHE_MODEL")
+                if model_name and importlib.util.find_spec("sentence_transformers") is not None:
+                    embedder: Any = SentenceEmbedder(model_name)
+                else:
+                    embedder = HashedNgramEmbedder()
+                _semantic_cache = SemanticCache(
+                    embedder,
+                    capacity=int(os.getenv("SEMANTIC_CACHE_SIZE", "1024")),
+                    threshold=float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.92")),
+                )
+    return _semantic_cache
@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+from array import array
+from typing import Any
+import os
+import threading
+import time
+
+import psutil
+
+FIELDS = ("timestamp", "cpu", "ram", "disk", "net_sent_mb", "net_recv_mb", "net_sent_kbps", "net_recv_kbps")
+ROUNDING = {"cpu": 1, "ram": 1, "disk": 1, "net_sent_mb": 2, "net_recv_mb": 2, "net_sent_kbps": 1, "net_recv_kbps": 1}
+
+
+class StatsSampler:
+    def __init__(self, interval: float = 1.0, capacity: int = 3600, disk_path: str = "/") -> None:
+        self.interval = interval
+        self.capacity = max(2, capacity)
+        self.disk_path = disk_path
+        self._width = len(FIELDS)
+        self._samples = array("d", bytes(8 * self._width * self.capacity))
+        self._count = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def sequence(self) -> int:
+        return self._count
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+            psutil.cpu_percent(interval=None)
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="stats-sampler", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join()
+
+    def latest(self) -> dict[str, float]:
+        self.start()
+        with self._lock:
+            count = self._count
+            row = self._row(count - 1) if count else None
+        if row is None:
+            return self._format(self._measure(None))
+        return self._format(row)
+
+    def history(self, seconds: float = 300.0, points: int = 120) -> list[dict[str, float]]:
+        self.start()
+        since = time.time() - seconds
+        with self._lock:
+            available = min(self._count, self.capacity)
+            rows = [self._row(index) for index in range(self._count - available, self._count)]
+        rows = [row for row in rows if row[0] >= since]
+        points = max(1, points)
+        if len(rows) <= points:
+            return [self._format(row) for row in rows]
+        # Downsample by averaging equal-sized buckets, keeping the last timestamp of each bucket.
+        bucket = len(rows) / points
+        averaged = []
+        for index in range(points):
+            chunk = rows[int(index * bucket):int((index + 1) * bucket)]
+            mean = [sum(values) / len(chunk) for values in zip(*chunk)]
+            mean[0] = chunk[-1][0]
+            averaged.append(self._format(mean))
+        return averaged
+
+    def _run(self) -> None:
+        previous: list[float] | None = None
+        while not self._stop.is_set():
+            started = time.monotonic()
+            try:
+                sample = self._measure(previous)
+            except Exception:  # noqa: BLE001
+                sample = None
+            if sample is not None:
+                with self._lock:
+                    offset = (self._count % self.capacity) * self._width
+                    self._samples[offset:offset + self._width] = array("d", sample)
+                    self._count += 1
+                previous = sample
+            self._stop.wait(max(0.0, self.interval - (time.monotonic() - started)))
+
+    def _measure(self, previous: list[float] | None) -> list[float]:
+        now = time.time()
+        net = psutil.net_io_counters()
+        sent_mb = net.bytes_sent / 1_048_576
+        recv_mb = net.bytes_recv / 1_048_576
+        sent_kbps = recv_kbps = 0.0
+        if previous is not None and now > previous[0]:
+            elapsed = now - previous[0]
+            sent_kbps = max(0.0, (sent_mb - previous[4]) * 8192 / elapsed)
+            recv_kbps = max(0.0, (recv_mb - previous[5]) * 8192 / elapsed)
+        return [
+            now,
+            psutil.cpu_percent(interval=None),
+            psutil.virtual_memory().percent,
+            psutil.disk_usage(self.disk_path).percent,
+            sent_mb,
+            recv_mb,
+            sent_kbps,
+            recv_kbps,
+        ]
+
+    def _row(self, index: int) -> list[float]:
+        offset = (index % self.capacity) * self._width
+        return self._samples[offset:offset + self._width].tolist()
+
+    def _format(self, row: list[float]) -> dict[str, float]:
+        values: dict[str, Any] = {"timestamp": round(row[0], 3)}
+        for name, value in zip(FIELDS[1:], row[1:]):
+            values[name] = round(value, ROUNDING[name])
+        return values
+
+
+_sampler: StatsSampler | None = None
+_sampler_lock = threading.Lock()
+
+
+def get_stats_sampler() -> StatsSampler:
+    global _sampler
+    if _sampler is None:
+        with _sampler_lock:
+            if _sampler is None:
+                _sampler = StatsSampler(
+                    interval=float(os.getenv("STATS_INTERVAL", "1.0")),
+                    capacity=int(os.getenv("STATS_HISTORY", "3600")),
+                )
+    return _sampler
@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Any
+import importlib.util
+
+TURN_OVERHEAD = 4
+TIKTOKEN_ENCODINGS = {"openrouter": "o200k_base"}
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + 3) // 4
+
+
+@lru_cache(maxsize=4)
+def _encoding(name: str) -> Any:
+    if importlib.util.find_spec("tiktoken") is None:
+        return None
+    tiktoken = __import__("tiktoken")
+    try:
+        return tiktoken.get_encoding(name)
+    except Exception:  # noqa: BLE001
+        return None
+
+
+@lru_cache(maxsize=8192)
+def count_tokens(text: str, provider: str = "") -> int:
+    # Counts are memoized per text, so the unchanged history prefix of a conversation is only
+    # tokenized once no matter how many turns follow.
+    encoding = _encoding(TIKTOKEN_ENCODINGS[provider]) if provider in TIKTOKEN_ENCODINGS else None
+    if encoding is None:
+        return estimate_tokens(text)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def fit_history(
+    history: list[dict[str, str]], budget: int, provider: str = "", reserved: int = 0
+) -> list[dict[str, str]]:
+    remaining = budget - reserved
+    kept: list[dict[str, str]] = []
+    for turn in reversed(history):
+        cost = count_tokens(turn["content"], provider) + TURN_OVERHEAD
+        if cost > remaining:
+            break
+        kept.append(turn)
+        remaining -= cost
+    kept.reverse()
+    return kept
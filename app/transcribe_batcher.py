@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+from concurrent.futures import Future
+from typing import Any
+import asyncio
+import os
+import queue
+import threading
+import time
+
+from app.whisper_pool import WhisperModelPool, get_whisper_pool
+
+
+class TranscriptionBatcher:
+    def __init__(self, pool: WhisperModelPool, max_batch_size: int = 8, max_wait: float = 0.05) -> None:
+        self.pool = pool
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait
+        self._queue: queue.Queue[tuple[Any, Future[str]]] = queue.Queue()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+        self._stats = {"requests": 0, "batches": 0, "long_form": 0, "errors": 0, "busy_seconds": 0.0}
+
+    def submit(self, audio: Any) -> Future[str]:
+        future: Future[str] = Future()
+        self._queue.put((audio, future))
+        self._ensure_started()
+        return future
+
+    async def transcribe(self, audio: Any) -> str:
+        return await asyncio.wrap_future(self.submit(audio))
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            stats: dict[str, Any] = dict(self._stats)
+        stats["queued"] = self._queue.qsize()
+        stats["max_batch_size"] = self.max_batch_size
+        stats["max_wait"] = self.max_wait
+        stats["avg_batch_size"] = round(stats["requests"] / stats["batches"], 2) if stats["batches"] else None
+        busy = stats.pop("busy_seconds")
+        stats["throughput_per_second"] = round(stats["requests"] / busy, 2) if busy else None
+        return stats
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="transcribe-batcher", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            # Callers that went away while queued cancelled their futures; those are dropped here, and
+            # the rest can no longer be cancelled once they are marked running.
+            batch = [(source, future) for source, future in batch if future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            try:
+                self._process(batch)
+            except BaseException as exc:  # noqa: BLE001
+                # Nothing may escape, or the worker dies and every later request hangs.
+                for _source, future in batch:
+                    fail(future, exc)
+
+    def _process(self, batch: list[tuple[Any, Future[str]]]) -> None:
+        started = time.perf_counter()
+        whisper = __import__("whisper")
+        audios: list[Any] = []
+        futures: list[Future[str]] = []
+        for source, future in batch:
+            try:
+                audios.append(whisper.load_audio(source) if isinstance(source, str) else source)
+                futures.append(future)
+            except Exception as exc:  # noqa: BLE001
+                fail(future, exc)
+        long_form = 0
+        try:
+            if audios:
+                with self.pool.acquire() as model:
+                    texts, long_form = self._decode(whisper, model, audios)
+                for future, text in zip(futures, texts):
+                    if not future.done():
+                        future.set_result(text)
+        except Exception as exc:  # noqa: BLE001
+            for future in futures:
+                fail(future, exc)
+        with self._lock:
+            self._stats["requests"] += len(batch)
+            self._stats["batches"] += 1
+            self._stats["long_form"] += long_form
+            self._stats["errors"] += len(batch) - len(futures)
+            self._stats["busy_seconds"] += time.perf_counter() - started
+
+    def _decode(self, whisper: Any, model: Any, audios: list[Any]) -> tuple[list[str], int]:
+        torch = __import__("torch")
+        texts = [""] * len(audios)
+        short = [index for index, audio in enumerate(audios) if len(audio) <= whisper.audio.N_SAMPLES]
+        # Clips longer than one 30 s window need whisper's sliding-window decoder, which
+        # cannot be batched, so they are transcribed one by one.
+        for index, audio in enumerate(audios):
+            if len(audio) > whisper.audio.N_SAMPLES:
+                texts[index] = model.transcribe(audio)["text"].strip()
+        if short:
+            mels = torch.stack(
+                [
+                    whisper.log_mel_spectrogram(whisper.pad_or_trim(audios[index]), n_mels=model.dims.n_mels)
+                    for index in short
+                ]
+            ).to(model.device)
+            options = whisper.DecodingOptions(fp16=model.device.type == "cuda")
+            for index, result in zip(short, whisper.decode(model, mels, options)):
+                texts[index] = result.text.strip()
+        return texts, len(audios) - len(short)
+
+
+def fail(future: Future[str], exc: BaseException) -> None:
+    if not future.done():
+        future.set_exception(exc)
+
+
+_batcher: TranscriptionBatcher | None = None
+_batcher_lock = threading.Lock()
+
+
+def get_transcription_batcher() -> TranscriptionBatcher | None:
+    global _batcher
+    max_batch_size = int(os.getenv("WHISPER_BATCH_SIZE", "1"))
+    if max_batch_size <= 1:
+        return None
+    if _batcher is None:
+        with _batcher_lock:
+            if _batcher is None:
+                _batcher = TranscriptionBatcher(
+                    get_whisper_pool(),
+                    max_batch_size=max_batch_size,
+                    max_wait=float(os.getenv("WHISPER_BATCH_WAIT", "0.05")),
+                )
+    return _batcher
@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any
+import asyncio
+import os
+import threading
+import time
+
+from app.http_client import get_async_http_client, get_http_client
+from app.timeutil import parse_timestamp
+
+WEATHER_URL = "https://api.open-meteo.com/v1/forecast"
+MIN_TTL = 60.0
+
+Cell = tuple[float, float]
+
+
+class WeatherCache:
+    def __init__(self, grid: float = 0.01, ttl: float = 900.0, stale: float = 3600.0, max_cells: int = 4096) -> None:
+        self.grid = grid
+        self.ttl = ttl
+        self.stale = stale
+        self.max_cells = max_cells
+        self._entries: OrderedDict[Cell, tuple[float, dict[str, Any]]] = OrderedDict()
+        self._inflight: dict[Cell, Future[dict[str, Any]]] = {}
+        self._tasks: set[asyncio.Task[None]] = set()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "stale_hits": 0, "misses": 0, "coalesced": 0, "fetches": 0, "errors": 0}
+
+    def cell(self, lat: float, lon: float) -> Cell:
+        if self.grid <= 0:
+            return float(lat), float(lon)
+        return round(round(lat / self.grid) * self.grid, 6), round(round(lon / self.grid) * self.grid, 6)
+
+    def get(self, lat: float, lon: float) -> dict[str, Any]:
+        cell = self.cell(lat, lon)
+        data, future, leader = self._lookup(cell)
+        if data is not None:
+            if leader:
+                threading.Thread(target=self._refresh, args=(cell, future), name="weather-refresh", daemon=True).start()
+            return data
+        assert future is not None
+        if leader:
+            self._refresh(cell, future)
+        return future.result()
+
+    async def aget(self, lat: float, lon: float) -> dict[str, Any]:
+        cell = self.cell(lat, lon)
+        data, future, leader = self._lookup(cell)
+        assert data is not None or future is not None
+        if leader:
+            # The fetch runs as its own task and each waiter awaits a shielded view of the shared future,
+            # so a cancelled caller neither stops the fetch nor cancels it for the coalesced waiters.
+            task = asyncio.create_task(self._arefresh(cell, future))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        if data is not None:
+            return data
+        return await asyncio.shield(asyncio.wrap_future(future))
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                **self._stats,
+                "cells": len(self._entries),
+                "inflight": len(self._inflight),
+                "grid": self.grid,
+                "ttl": self.ttl,
+            }
+
+    def _lookup(self, cell: Cell) -> tuple[dict[str, Any] | None, Future[dict[str, Any]] | None, bool]:
+        # Returns the data to serve now (fresh or stale), the future to wait on or resolve, and whether
+        # the caller is the single leader responsible for fetching this cell.
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(cell)
+            pending = self._inflight.get(cell)
+            if entry is not None:
+                expires_at, data = entry
+                if now < expires_at:
+                    self._entries.move_to_end(cell)
+                    self._stats["hits"] += 1
+                    return data, None, False
+                if now < expires_at + self.stale:
+                    self._stats["stale_hits"] += 1
+                    if pending is not None:
+                        return data, None, False
+                    future: Future[dict[str, Any]] = Future()
+                    self._inflight[cell] = future
+                    return data, future, True
+            if pending is not None:
+                self._stats["coalesced"] += 1
+                return None, pending, False
+            self._stats["misses"] += 1
+            future = Future()
+            self._inflight[cell] = future
+            return None, future, True
+
+    def _refresh(self, cell: Cell, future: Future[dict[str, Any]]) -> None:
+        try:
+            response = get_http_client().get(WEATHER_URL, params=self._params(cell))
+            response.raise_for_status()
+            data = response.json()
+        except BaseException as exc:
+            self._fail(cell, future, exc)
+            return
+        self._store(cell, future, data)
+
+    async def _arefresh(self, cell: Cell, future: Future[dict[str, Any]]) -> None:
+        try:
+            response = await get_async_http_client().get(WEATHER_URL, params=self._params(cell))
+            response.raise_for_status()
+            data = response.json()
+        except BaseException as exc:
+            self._fail(cell, future, exc)
+            return
+        self._store(cell, future, data)
+
+    def _params(self, cell: Cell) -> dict[str, Any]:
+        return {"latitude": cell[0], "longitude": cell[1], "current_weather": "true"}
+
+    def _expires_at(self, data: dict[str, Any], now: float) -> float:
+        # open-meteo publishes current conditions in fixed slots (15 minutes by default); entries expire
+        # when the next slot is due rather than a fixed time after the fetch.
+        current = data.get("current_weather") or {}
+        interval = float(current.get("interval") or self.ttl)
+        started = parse_timestamp(current.get("time")) if current.get("time") else 0.0
+        if not started:
+            return now + self.ttl
+        expires_at = started - float(data.get("utc_offset_seconds") or 0) + interval
+        return min(max(expires_at, now + MIN_TTL), now + self.ttl)
+
+    def _store(self, cell: Cell, future: Future[dict[str, Any]], data: dict[str, Any]) -> None:
+        now = time.time()
+        with self._lock:
+            self._entries[cell] = (self._expires_at(data, now), data)
+            self._entries.move_to_end(cell)
+            while len(self._entries) > self.max_cells:
+                self._entries.popitem(last=False)
+            self._inflight.pop(cell, None)
+            self._stats["fetches"] += 1
+        if not future.done():
+            future.set_result(data)
+
+    def _fail(self, cell: Cell, future: Future[dict[str, Any]], exc: BaseException) -> None:
+        with self._lock:
+            self._inflight.pop(cell, None)
+            self._stats["errors"] += 1
+        if not future.done():
+            future.set_exception(exc)
+
+
+_cache: WeatherCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_weather_cache() -> WeatherCache:
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = WeatherCache(
+                    grid=float(os.getenv("WEATHER_GRID", "0.01")),
+                    ttl=float(os.getenv("WEATHER_TTL", "900")),
+                    stale=float(os.getenv("WEATHER_STALE", "3600")),
+                    max_cells=int(os.getenv("WEATHER_CACHE_CELLS", "4096")),
+                )
+    return _cache
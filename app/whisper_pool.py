@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+from typing import Any, Iterator
+import gc
+import os
+import threading
+import time
+
+
+class WhisperModelPool:
+    def __init__(self, model_name: str, size: int = 1, idle_timeout: float = 300.0) -> None:
+        self.model_name = model_name
+        self.size = max(1, size)
+        self.idle_timeout = idle_timeout
+        self._idle: list[Any] = []
+        self._loaded = 0
+        self._in_use = 0
+        self._waiting = 0
+        self._last_used = time.monotonic()
+        self._condition = threading.Condition()
+        self._reaper: threading.Thread | None = None
+        self._stats = {"loads": 0, "unloads": 0, "transcriptions": 0}
+
+    def warm_up(self) -> None:
+        with self.acquire():
+            pass
+
+    def transcribe(self, audio: Any, **kwargs: Any) -> dict[str, Any]:
+        with self.acquire() as model:
+            result: dict[str, Any] = model.transcribe(audio, **kwargs)
+        with self._condition:
+            self._stats["transcriptions"] += 1
+        return result
+
+    @contextmanager
+    def acquire(self) -> Iterator[Any]:
+        model = self._checkout()
+        try:
+            yield model
+        finally:
+            with self._condition:
+                self._idle.append(model)
+                self._in_use -= 1
+                self._last_used = time.monotonic()
+                self._condition.notify()
+
+    def unload(self) -> None:
+        with self._condition:
+            dropped = len(self._idle)
+            self._idle.clear()
+            self._loaded -= dropped
+            self._stats["unloads"] += dropped
+        if dropped:
+            gc.collect()
+
+    def stats(self) -> dict[str, Any]:
+        with self._condition:
+            return {
+                "model": self.model_name,
+                "size": self.size,
+                "loaded": self._loaded,
+                "in_use": self._in_use,
+                "waiting": self._waiting,
+                "idle_seconds": round(time.monotonic() - self._last_used, 1),
+                **self._stats,
+            }
+
+    def _checkout(self) -> Any:
+        with self._condition:
+            self._waiting += 1
+            try:
+                while not self._idle and self._loaded >= self.size:
+                    self._condition.wait()
+            finally:
+                self._waiting -= 1
+            self._in_use += 1
+            if self._idle:
+                return self._idle.pop()
+            self._loaded += 1
+        try:
+            model = self._load()
+        except Exception:
+            with self._condition:
+                self._loaded -= 1
+                self._in_use -= 1
+                self._condition.notify()
+            raise
+        with self._condition:
+            self._stats["loads"] += 1
+        self._start_reaper()
+        return model
+
+    def _load(self) -> Any:
+        whisper = __import__("whisper")
+        return whisper.load_model(self.model_name)
+
+    def _start_reaper(self) -> None:
+        if self._reaper is not None or self.idle_timeout <= 0:
+            return
+        with self._condition:
+            if self._reaper is not None:
+                return
+            self._reaper = threading.Thread(target=self._reap, name="whisper-reaper", daemon=True)
+            self._reaper.start()
+
+    def _reap(self) -> None:
+        while True:
+            time.sleep(max(self.idle_timeout / 2, 1.0))
+            with self._condition:
+                expired = self._in_use == 0 and time.monotonic() - self._last_used >= self.idle_timeout
+            if expired:
+                self.unload()
+
+
+_pools: dict[str, WhisperModelPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_whisper_pool(model_name: str | None = None) -> WhisperModelPool:
+    name = model_name or os.getenv("WHISPER_MODEL", "base")
+    with _pools_lock:
+        pool = _pools.get(name)
+        if pool is None:
+            pool = WhisperModelPool(
+                name,
+                size=int(os.getenv("WHISPER_POOL_SIZE", "1")),
+                idle_timeout=float(os.getenv("WHISPER_IDLE_TIMEOUT", "300")),
+            )
+            _pools[name] = pool
+    return pool
+
+
+def whisper_pool_stats() -> list[dict[str, Any]]:
+    with _pools_lock:
+        pools = list(_pools.values())
+    return [pool.stats() for pool in pools]
@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sys
+import time
+from typing import Any, Callable
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.intents import IntentEngine  # noqa: E402
+
+TEMPLATES = (
+    "open {app}",
+    "close {app}",
+    "search {topic}",
+    "can you search for {topic} please",
+    "find {topic}",
+    "set volume to {number}",
+    "brightness {number}",
+    "click {number} {number}",
+    "write a poem about {topic}",
+    "shayari on {topic}",
+    "weather {lat} {lon}",
+    "what's the weather like today",
+    "latest {topic} news",
+    "{topic} stock price",
+    "show me the system status",
+    "tell me a story about {topic} and the {topic}",
+    "how do I cook {topic} without an oven",
+    "explain the difference between {topic} and {topic} in simple words",
+)
+LEGACY_KINDS = frozenset({"pc_control", "web_search", "writing", "weather", "news", "price"})
+REALTIME_KINDS = frozenset({"weather", "news", "price"})
+APPS = ("notepad", "chrome", "spotify", "calculator", "terminal", "vs code")
+TOPICS = ("python", "bitcoin", "cricket", "tesla", "monsoon", "rust", "jazz", "paneer", "delhi", "mars")
+
+
+def legacy_intent(text: str) -> str:
+    # The previous desktop chain: one substring scan per keyword, in rule order.
+    lowered = text.lower().strip()
+    if lowered.startswith("open ") or lowered.startswith("close "):
+        return "pc_control"
+    if "search" in lowered or lowered.startswith("find "):
+        return "web_search"
+    if any(keyword in lowered for keyword in ("volume", "brightness", "screenshot", "type ", "press ", "click ")):
+        return "pc_control"
+    if "shayari" in lowered or "poem" in lowered:
+        return "writing"
+    if "weather" in lowered or "news" in lowered or "price" in lowered or "stock" in lowered:
+        return "realtime"
+    return "general"
+
+
+def legacy_slots(text: str, kind: str) -> dict[str, Any]:
+    # What the desktop handlers then re-parsed from the raw text for each kind.
+    lowered = text.lower()
+    if kind == "web_search":
+        return {"query": text.split("search", 1)[-1].strip() if "search" in lowered else text}
+    if kind == "pc_control":
+        return {"numbers": [int(item) for item in lowered.split() if item.isdigit()]}
+    if kind == "realtime":
+        if "weather" in lowered:
+            return {"coordinates": [item for item in lowered.replace("weather", "").split() if is_number(item)]}
+        if "news" in lowered:
+            return {"topic": lowered.replace("news", "").strip() or "latest"}
+        return {"topic": lowered.replace("price", "").replace("stock", "").strip()}
+    return {}
+
+
+def is_number(value: str) -> bool:
+    try:
+        float(value)
+    except ValueError:
+        return False
+    return True
+
+
+def corpus(size: int, seed: int) -> list[str]:
+    rng = random.Random(seed)
+    utterances = []
+    for _ in range(size):
+        template = rng.choice(TEMPLATES)
+        while "{" in template:
+            template = (
+                template.replace("{app}", rng.choice(APPS), 1)
+                .replace("{topic}", rng.choice(TOPICS), 1)
+                .replace("{number}", str(rng.randint(0, 1000)), 1)
+                .replace("{lat}", f"{rng.uniform(-90, 90):.2f}", 1)
+                .replace("{lon}", f"{rng.uniform(-180, 180):.2f}", 1)
+            )
+        utterances.append(template)
+    return utterances
+
+
+def agreement(engine: IntentEngine, utterances: list[str]) -> list[tuple[str, str, str]]:
+    # The engine must route every utterance the way the previous chain did (its realtime kinds are split).
+    mismatches = []
+    for text in utterances:
+        match = engine.classify(text, kinds=LEGACY_KINDS)
+        kind = "general" if match is None else "realtime" if match.kind in REALTIME_KINDS else match.kind
+        expected = legacy_intent(text)
+        if kind != expected:
+            mismatches.append((text, expected, kind))
+    return mismatches
+
+
+def rate(label: str, utterances: list[str], handle: Callable[[str], Any]) -> float:
+    started = time.perf_counter()
+    for text in utterances:
+        handle(text)
+    per_second = len(utterances) / (time.perf_counter() - started)
+    print(f"{label}: {per_second:,.0f} utterances/s")
+    return per_second
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the intent engine.")
+    parser.add_argument("--utterances", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    utterances = corpus(args.utterances, args.seed)
+    mismatches = agreement(IntentEngine(cache_size=0), utterances)
+    if mismatches:
+        for text, expected, kind in mismatches[:10]:
+            print(f"mismatch: {text!r} legacy={expected} engine={kind}")
+        raise SystemExit(f"{len(mismatches):,} of {len(utterances):,} utterances disagree with the legacy chain")
+    print(f"agreement: all {len(utterances):,} utterances route as in the legacy chain")
+
+    rate("legacy chain", utterances, legacy_intent)
+    legacy = rate("legacy chain + handler parsing", utterances, lambda text: legacy_slots(text, legacy_intent(text)))
+    cold = rate("intent engine, uncached (with slots)", utterances, IntentEngine(cache_size=0).classify)
+    cached = rate("intent engine, cached (with slots)", utterances, IntentEngine().classify)
+    print(f"speedup over legacy + parsing: {cold / legacy:.2f}x uncached, {cached / legacy:.2f}x cached")
+
+    engine = IntentEngine(cache_size=0)
+    kinds: dict[str, int] = {}
+    for text in utterances:
+        match = engine.classify(text)
+        kind = match.kind if match else "general"
+        kinds[kind] = kinds.get(kind, 0) + 1
+    print("kinds: " + ", ".join(f"{kind}={count:,}" for kind, count in sorted(kinds.items())))
+
+
+if __name__ == "__main__":
+    main()
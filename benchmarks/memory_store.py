@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from desktop_app.memory import MemoryStore  # noqa: E402
+
+CATEGORIES = ("preference", "command", "style", "note")
+
+
+def legacy_inserts(root: str, count: int) -> float:
+    # The previous store opened a new connection and committed a rollback journal per row.
+    path = os.path.join(root, "legacy.sqlite3")
+    with sqlite3.connect(path) as conn:
+        conn.execute(
+            "CREATE TABLE memories (id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp TEXT NOT NULL, "
+            "category TEXT NOT NULL, content TEXT NOT NULL)"
+        )
+    started = time.perf_counter()
+    for index in range(count):
+        with sqlite3.connect(path) as conn:
+            conn.execute(
+                "INSERT INTO memories (timestamp, category, content) VALUES (?, ?, ?)",
+                ("2026-01-01T00:00:00", CATEGORIES[index % len(CATEGORIES)], f"memory {index}"),
+            )
+            conn.commit()
+    return count / (time.perf_counter() - started)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the desktop MemoryStore.")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--batch", type=int, default=10_000)
+    parser.add_argument("--legacy-rows", type=int, default=2_000)
+    parser.add_argument("--pages", type=int, default=1_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        store = MemoryStore(root)
+        started = time.perf_counter()
+        for offset in range(0, args.rows, args.batch):
+            size = min(args.batch, args.rows - offset)
+            store.save_many(
+                (CATEGORIES[index % len(CATEGORIES)], f"memory {index} about topic {index % 997}")
+                for index in range(offset, offset + size)
+            )
+        elapsed = time.perf_counter() - started
+        print(f"bulk insert: {args.rows:,} rows in {elapsed:.2f}s ({args.rows / elapsed:,.0f} rows/s)")
+
+        started = time.perf_counter()
+        for index in range(2_000):
+            store.save_long_term(CATEGORIES[index % len(CATEGORIES)], f"single {index}")
+        elapsed = time.perf_counter() - started
+        print(f"single insert: {2_000 / elapsed:,.0f} rows/s")
+
+        started = time.perf_counter()
+        cursor = None
+        pages = 0
+        for _ in range(args.pages):
+            items = store.fetch_long_term(["preference"], limit=50, before=cursor)
+            if not items:
+                break
+            pages += 1
+            cursor = (items[-1].timestamp, items[-1].id or 0)
+        elapsed = time.perf_counter() - started
+        per_page = elapsed / max(pages, 1) * 1000
+        print(f"paginated fetch: {pages:,} pages of up to 50 in {elapsed:.2f}s ({per_page:.2f} ms/page)")
+        store.close()
+
+        rate = legacy_inserts(root, args.legacy_rows)
+        print(f"legacy single insert (connect per call): {rate:,.0f} rows/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -14,11 +14,22 @@ class AppConfig:
     openrouter_model: str = os.getenv("OPENROUTER_MODEL", "openai/gpt-4o-mini")
     hf_api_key: str | None = os.getenv("HF_API_KEY")
     hf_model: str = os.getenv("HF_MODEL", "google/flan-t5-large")
+    llm_race_mode: str = os.getenv("LLM_RACE_MODE", "off")
+    llm_race_width: int = int(os.getenv("LLM_RACE_WIDTH", "2"))
+    llm_hedge_percentile: float = float(os.getenv("LLM_HEDGE_PERCENTILE", "0.9"))
+    llm_context_budget: int = int(os.getenv("LLM_CONTEXT_BUDGET", "3000"))
     whisper_model: str = os.getenv("WHISPER_MODEL", "base")
     piper_voice: str = os.getenv("PIPER_VOICE", "en_US-amy-low")
     voice_record_seconds: int = int(os.getenv("VOICE_RECORD_SECONDS", "5"))
     voice_sample_rate: int = int(os.getenv("VOICE_SAMPLE_RATE", "16000"))
+    voice_vad: str = os.getenv("VOICE_VAD", "auto")
+    voice_silence_seconds: float = float(os.getenv("VOICE_SILENCE_SECONDS", "0.8"))
+    voice_max_seconds: float = float(os.getenv("VOICE_MAX_SECONDS", "30"))
+    voice_wake_word: str = os.getenv("VOICE_WAKE_WORD", "")
     auto_speak: bool = os.getenv("AUTO_SPEAK", "1") != "0"
+    memory_context_k: int = int(os.getenv("MEMORY_CONTEXT_K", "3"))
+    session_max_turns: int = int(os.getenv("SESSION_MAX_TURNS", "40"))
+    session_max_tokens: int = int(os.getenv("SESSION_MAX_TOKENS", "3000"))
 
 
 DEFAULT_SYSTEM_PROMPT = (
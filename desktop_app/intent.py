@@ -1,24 +1,56 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import Any, Iterable
+import os
+
+from app.intent_classifier import SEED_EXAMPLES, command_examples, get_intent_classifier
+from app.intents import get_intent_engine
+
+DESKTOP_KINDS = frozenset({"pc_control", "web_search", "writing", "weather", "news", "price"})
+REALTIME_KINDS = frozenset({"weather", "news", "price"})
+CLASSIFIER_LABELS = frozenset({"open_app", "close_app", "web_search", "weather", "news", "price"})
+APP_COMMANDS = {"open_app": "open", "close_app": "close"}
+CONFIRM_WORDS = frozenset({"yes", "y", "yeah", "yep", "sure", "ok", "okay", "do it", "go ahead", "confirm"})
 
 
 @dataclass
 class Intent:
     kind: str
     payload: str
+    slots: dict[str, Any] = field(default_factory=dict)
 
 
 def detect_intent(text: str) -> Intent:
-    lowered = text.lower().strip()
-    if lowered.startswith("open ") or lowered.startswith("close "):
-        return Intent(kind="pc_control", payload=text)
-    if "search" in lowered or lowered.startswith("find "):
-        return Intent(kind="web_search", payload=text)
-    if any(keyword in lowered for keyword in ("volume", "brightness", "screenshot", "type ", "press ", "click ")):
-        return Intent(kind="pc_control", payload=text)
-    if "shayari" in lowered or "poem" in lowered:
-        return Intent(kind="writing", payload=text)
-    if "weather" in lowered or "news" in lowered or "price" in lowered or "stock" in lowered:
-        return Intent(kind="realtime", payload=text)
-    return Intent(kind="general", payload=text)
+    match = get_intent_engine().classify(text, kinds=DESKTOP_KINDS)
+    if match is not None:
+        return Intent(kind=match.kind, payload=text, slots=match.slots)
+    classifier = get_intent_classifier()
+    prediction = classifier.route(text, labels=CLASSIFIER_LABELS) if classifier else None
+    if prediction is None:
+        return Intent(kind="general", payload=text)
+    if prediction.label in APP_COMMANDS:
+        # A guessed app command is only suggested; the UI runs it after the user confirms.
+        target = prediction.slots.get("query")
+        if not target:
+            return Intent(kind="general", payload=text)
+        return Intent(kind="confirm", payload=f"{APP_COMMANDS[prediction.label]} {target}", slots=prediction.slots)
+    if prediction.label == "weather" and "coordinates" not in prediction.slots:
+        return Intent(kind="general", payload=text)
+    return Intent(kind=prediction.label, payload=text, slots=prediction.slots)
+
+
+def is_confirmation(text: str) -> bool:
+    return " ".join(text.lower().strip(" .!").split()) in CONFIRM_WORDS
+
+
+def train_intent_classifier(commands: Iterable[str]) -> bool:
+    # A model loaded from INTENT_MODEL is kept as is; otherwise saved commands extend the seed examples.
+    classifier = get_intent_classifier()
+    if classifier is None or os.getenv("INTENT_MODEL"):
+        return False
+    examples = command_examples(commands)
+    if not examples:
+        return False
+    classifier.fit([*SEED_EXAMPLES, *examples])
+    return True
@@ -4,21 +4,28 @@ from dataclasses import dataclass
 from datetime import datetime
 import os
 import sqlite3
+import threading
 from typing import Iterable
 
+from app.memory_search import FTS5_AVAILABLE, create_vector_index, fuse, rank_text
+from desktop_app.session import SessionMemory, SessionTurn
+
 
 @dataclass
 class MemoryItem:
     timestamp: str
     role: str
     content: str
+    id: int | None = None
 
 
 class MemoryStore:
-    def __init__(self, root_path: str) -> None:
+    def __init__(self, root_path: str, session: SessionMemory | None = None) -> None:
         self.root_path = self._normalize_path(root_path)
+        self._lock = threading.RLock()
+        self._conn: sqlite3.Connection | None = None
         self._ensure_db()
-        self.session_memory: list[MemoryItem] = []
+        self.session_memory = session or SessionMemory()
 
     def _normalize_path(self, path: str) -> str:
         expanded = os.path.expanduser(path.strip())
@@ -26,18 +33,51 @@ class MemoryStore:
 
     def _ensure_db(self) -> None:
         os.makedirs(self.root_path, exist_ok=True)
-        with sqlite3.connect(self._db_path()) as conn:
-            conn.execute(
-                """
-                CREATE TABLE IF NOT EXISTS memories (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    timestamp TEXT NOT NULL,
-                    category TEXT NOT NULL,
-                    content TEXT NOT NULL
-                )
-                """
+        conn = sqlite3.connect(self._db_path(), check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS memories (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                timestamp TEXT NOT NULL,
+                category TEXT NOT NULL,
+                content TEXT NOT NULL
             )
-            conn.commit()
+            """
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_memories_category_timestamp ON memories (category, timestamp)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_memories_timestamp ON memories (timestamp)")
+        if FTS5_AVAILABLE:
+            self._ensure_fts(conn)
+        conn.commit()
+        with self._lock:
+            previous, self._conn = self._conn, conn
+            self._vectors = create_vector_index()
+        if previous is not None:
+            previous.close()
+
+    def _ensure_fts(self, conn: sqlite3.Connection) -> None:
+        exists = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'memories_fts'").fetchone()
+        conn.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS memories_fts USING fts5(content, content='memories', content_rowid='id')"
+        )
+        conn.execute(
+            """
+            CREATE TRIGGER IF NOT EXISTS memories_fts_insert AFTER INSERT ON memories BEGIN
+                INSERT INTO memories_fts (rowid, content) VALUES (new.id, new.content);
+            END
+            """
+        )
+        conn.execute(
+            """
+            CREATE TRIGGER IF NOT EXISTS memories_fts_delete AFTER DELETE ON memories BEGIN
+                INSERT INTO memories_fts (memories_fts, rowid, content) VALUES ('delete', old.id, old.content);
+            END
+            """
+        )
+        if not exists:
+            conn.execute("INSERT INTO memories_fts (memories_fts) VALUES ('rebuild')")
 
     def _db_path(self) -> str:
         return os.path.join(self.root_path, "jarvis_memory.sqlite3")
@@ -46,20 +86,29 @@ class MemoryStore:
         self.root_path = self._normalize_path(path)
         self._ensure_db()
 
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
     def add_session(self, role: str, content: str) -> None:
-        item = MemoryItem(timestamp=self._timestamp(), role=role, content=content)
-        self.session_memory.append(item)
+        self.session_memory.add(role, content)
 
-    def recent_session(self, limit: int = 10) -> list[MemoryItem]:
-        return self.session_memory[-limit:]
+    def recent_session(self, limit: int = 10) -> list[SessionTurn]:
+        return self.session_memory.recent(limit)
 
     def save_long_term(self, category: str, content: str) -> None:
-        with sqlite3.connect(self._db_path()) as conn:
-            conn.execute(
-                "INSERT INTO memories (timestamp, category, content) VALUES (?, ?, ?)",
-                (self._timestamp(), category, content),
-            )
-            conn.commit()
+        self.save_many([(category, content)])
+
+    def save_many(self, items: Iterable[tuple[str, str]]) -> int:
+        timestamp = self._timestamp()
+        rows = [(timestamp, category, content) for category, content in items]
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.executemany("INSERT INTO memories (timestamp, category, content) VALUES (?, ?, ?)", rows)
+        return len(rows)
 
     def remember_preference(self, content: str) -> None:
         self.save_long_term("preference", content)
@@ -70,12 +119,54 @@ class MemoryStore:
     def remember_style(self, content: str) -> None:
         self.save_long_term("style", content)
 
-    def fetch_long_term(self, categories: Iterable[str]) -> list[MemoryItem]:
+    def fetch_long_term(
+        self,
+        categories: Iterable[str],
+        limit: int = 100,
+        before: tuple[str, int] | None = None,
+    ) -> list[MemoryItem]:
+        categories = tuple(categories)
+        if not categories:
+            return []
         placeholders = ",".join("?" for _ in categories)
-        query = f"SELECT timestamp, category, content FROM memories WHERE category IN ({placeholders})"
-        with sqlite3.connect(self._db_path()) as conn:
-            rows = conn.execute(query, tuple(categories)).fetchall()
-        return [MemoryItem(timestamp=row[0], role=row[1], content=row[2]) for row in rows]
+        query = f"SELECT id, timestamp, category, content FROM memories WHERE category IN ({placeholders})"
+        params: list[object] = list(categories)
+        if before is not None:
+            query += " AND (timestamp, id) < (?, ?)"
+            params.extend(before)
+        query += " ORDER BY timestamp DESC, id DESC LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            rows = self._connection().execute(query, params).fetchall()
+        return [MemoryItem(timestamp=row[1], role=row[2], content=row[3], id=row[0]) for row in rows]
+
+    def search(self, query: str, limit: int = 5) -> list[MemoryItem]:
+        with self._lock:
+            conn = self._connection()
+            if FTS5_AVAILABLE:
+                rankings = [rank_text(conn, query, limit * 4, "memories_fts", fts=True)]
+            else:
+                rankings = [rank_text(conn, query, limit * 4, "memories", fts=False)]
+            if self._vectors is not None:
+                self._vectors.sync(
+                    conn.execute("SELECT id, content FROM memories WHERE id > ? ORDER BY id", (self._vectors.max_id,))
+                )
+                rankings.append(self._vectors.search(query, limit * 4))
+            ids = fuse(rankings, limit)
+            if not ids:
+                return []
+            placeholders = ",".join("?" for _ in ids)
+            rows = conn.execute(
+                f"SELECT id, timestamp, category, content FROM memories WHERE id IN ({placeholders})", ids
+            ).fetchall()
+        found = {row[0]: MemoryItem(timestamp=row[1], role=row[2], content=row[3], id=row[0]) for row in rows}
+        return [found[item_id] for item_id in ids if item_id in found]
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._ensure_db()
+        assert self._conn is not None
+        return self._conn
 
     def _timestamp(self) -> str:
         return datetime.utcnow().isoformat()
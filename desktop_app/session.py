@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+from collections import deque
+from datetime import datetime
+from typing import Callable
+import threading
+
+from app.tokens import estimate_tokens
+
+
+class SessionTurn:
+    __slots__ = ("timestamp", "role", "content", "tokens")
+
+    def __init__(self, timestamp: str, role: str, content: str, tokens: int) -> None:
+        self.timestamp = timestamp
+        self.role = role
+        self.content = content
+        self.tokens = tokens
+
+    def __repr__(self) -> str:
+        return f"SessionTurn(role={self.role!r}, tokens={self.tokens})"
+
+
+Summarizer = Callable[[str, list[SessionTurn]], str]
+
+
+class SessionMemory:
+    def __init__(
+        self,
+        max_turns: int = 40,
+        max_tokens: int = 3000,
+        summary_chars: int = 1200,
+        summarizer: Summarizer | None = None,
+    ) -> None:
+        self.max_turns = max(2, max_turns)
+        self.max_tokens = max_tokens
+        self.summary_chars = summary_chars
+        self.summarizer = summarizer
+        self.summary = ""
+        self._turns: deque[SessionTurn] = deque()
+        self._tokens = 0
+        self._evicted: list[SessionTurn] = []
+        self._lock = threading.Lock()
+        self._summarizing = False
+
+    def add(self, role: str, content: str) -> SessionTurn:
+        turn = SessionTurn(datetime.utcnow().isoformat(), role, content, estimate_tokens(content))
+        with self._lock:
+            self._turns.append(turn)
+            self._tokens += turn.tokens
+            if len(self._turns) > self.max_turns or self._tokens > self.max_tokens:
+                # Evict down to three quarters of the limits so summaries cover several turns at once.
+                while len(self._turns) > 1 and (
+                    len(self._turns) > self.max_turns * 3 // 4 or self._tokens > self.max_tokens * 3 // 4
+                ):
+                    evicted = self._turns.popleft()
+                    self._tokens -= evicted.tokens
+                    self._evicted.append(evicted)
+            start = bool(self._evicted) and not self._summarizing
+            if start:
+                self._summarizing = True
+        if start:
+            threading.Thread(target=self._summarize, name="session-summary", daemon=True).start()
+        return turn
+
+    def recent(self, limit: int = 10) -> list[SessionTurn]:
+        with self._lock:
+            return list(self._turns)[-limit:] if limit > 0 else []
+
+    def window(self, token_budget: int) -> list[SessionTurn]:
+        selected: list[SessionTurn] = []
+        used = 0
+        with self._lock:
+            for turn in reversed(self._turns):
+                if used + turn.tokens > token_budget:
+                    break
+                selected.append(turn)
+                used += turn.tokens
+        selected.reverse()
+        return selected
+
+    def __len__(self) -> int:
+        return len(self._turns)
+
+    def _summarize(self) -> None:
+        # Turns that fall out of the window are folded into a rolling summary off the UI thread.
+        while True:
+            with self._lock:
+                evicted, self._evicted = self._evicted, []
+                if not evicted:
+                    self._summarizing = False
+                    return
+                previous = self.summary
+            summary = ""
+            if self.summarizer is not None:
+                try:
+                    summary = self.summarizer(previous, evicted)
+                except Exception:  # noqa: BLE001
+                    summary = ""
+            if not summary:
+                summary = " ".join([previous, *(f"{turn.role}: {turn.content}" for turn in evicted)])
+            summary = " ".join(summary.split())
+            with self._lock:
+                self.summary = summary[-self.summary_chars:]
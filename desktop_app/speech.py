@@ -1,10 +1,22 @@
 from __future__ import annotations
 
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Iterator
+import queue
+import re
+import shutil
 import subprocess
-from typing import Any
+import threading
 
+from app.audio import piper_sample_rate, resample, stream_piper_cli
+from app.piper_worker import get_piper_pool
+from app.whisper_pool import get_whisper_pool
 from desktop_app.config import AppConfig
 from desktop_app.providers import is_module_available, load_module
+from desktop_app.vad import VoiceCapture
+
+SENTENCE_END = re.compile(r"(?<=[.!?])[\"')\]]*\s+|\n+")
+MIN_SENTENCE_CHARS = 20
 
 
 class SpeechEngine:
@@ -24,27 +36,157 @@ class SpeechEngine:
         sounddevice.wait()
         soundfile.write(output_path, recording, self.config.voice_sample_rate)
 
-    def transcribe(self, audio_path: str) -> str:
-        whisper = load_module("whisper")
-        model = whisper.load_model(self.config.whisper_model)
-        result: dict[str, Any] = model.transcribe(audio_path)
+    def listen(self, start_timeout: float | None = None, stop: threading.Event | None = None) -> str:
+        capture = VoiceCapture(
+            sample_rate=self.config.voice_sample_rate,
+            vad_mode=self.config.voice_vad,
+            silence=self.config.voice_silence_seconds,
+            max_seconds=self.config.voice_max_seconds,
+            start_timeout=start_timeout,
+        )
+        # Long utterances are cut at short pauses and each finished segment is transcribed while
+        # the rest is still being recorded.
+        pending: list[Future[str]] = []
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="transcribe") as executor:
+            for segment in capture.segments(stop):
+                audio = resample(segment, self.config.voice_sample_rate)
+                pending.append(executor.submit(self.transcribe, audio))
+            return " ".join(text for text in (future.result() for future in pending) if text)
+
+    def transcribe(self, audio: Any) -> str:
+        load_module("whisper")
+        result = get_whisper_pool(self.config.whisper_model).transcribe(audio)
         return result.get("text", "").strip()
 
     def speak(self, text: str) -> None:
-        command = [
-            "piper",
-            "--model",
-            self.config.piper_voice,
-            "--output_file",
-            "speech.wav",
-        ]
-        process = subprocess.Popen(command, stdin=subprocess.PIPE)
-        if process.stdin is not None:
-            process.stdin.write(text.encode("utf-8"))
-            process.stdin.close()
-        process.wait()
-        self._play_audio("speech.wav")
-
-    def _play_audio(self, path: str) -> None:
-        if subprocess.call(["ffplay", "-nodisp", "-autoexit", path]) != 0:
-            raise RuntimeError("ffplay is required to play audio")
+        utterance = self.open_utterance()
+        utterance.feed(text)
+        utterance.finish()
+
+    def open_utterance(self) -> Utterance:
+        return Utterance(self)
+
+    def synthesize_stream(self, text: str) -> tuple[int, Iterator[bytes]]:
+        pool = get_piper_pool(self.config.piper_voice)
+        if pool is not None:
+            return pool.sample_rate, pool.stream(text)
+        if not shutil.which("piper"):
+            raise RuntimeError("piper is required for voice output")
+        return piper_sample_rate(self.config.piper_voice), stream_piper_cli(text, self.config.piper_voice)
+
+
+class AudioSink:
+    def __init__(self, sample_rate: int) -> None:
+        self.sample_rate = sample_rate
+        self._stream: Any = None
+        self._process: subprocess.Popen[bytes] | None = None
+        self._remainder = b""
+        if is_module_available("sounddevice"):
+            sounddevice = load_module("sounddevice")
+            self._stream = sounddevice.RawOutputStream(samplerate=sample_rate, channels=1, dtype="int16")
+            self._stream.start()
+            return
+        try:
+            self._process = subprocess.Popen(
+                ["ffplay", "-nodisp", "-autoexit", "-loglevel", "error", "-f", "s16le", "-ar", str(sample_rate), "-ac", "1", "-i", "pipe:0"],
+                stdin=subprocess.PIPE,
+            )
+        except FileNotFoundError as exc:
+            raise RuntimeError("sounddevice or ffplay is required to play audio") from exc
+
+    def write(self, pcm: bytes) -> None:
+        pcm = self._remainder + pcm
+        usable = len(pcm) - len(pcm) % 2
+        self._remainder = pcm[usable:]
+        if not usable:
+            return
+        if self._stream is not None:
+            self._stream.write(pcm[:usable])
+        else:
+            assert self._process is not None and self._process.stdin is not None
+            self._process.stdin.write(pcm[:usable])
+
+    def close(self) -> None:
+        if self._stream is not None:
+            self._stream.stop()
+            self._stream.close()
+        elif self._process is not None:
+            assert self._process.stdin is not None
+            try:
+                self._process.stdin.close()
+            except OSError:
+                pass
+            self._process.wait()
+
+
+class Utterance:
+    def __init__(self, engine: SpeechEngine) -> None:
+        self.engine = engine
+        self._buffer = ""
+        self._sample_rate: int | None = None
+        self._error: Exception | None = None
+        self._sentences: queue.Queue[str | None] = queue.Queue()
+        self._audio: queue.Queue[bytes | None] = queue.Queue(maxsize=64)
+        self._synthesizer = threading.Thread(target=self._synthesize, name="tts-synthesize", daemon=True)
+        self._player = threading.Thread(target=self._play, name="tts-play", daemon=True)
+        self._synthesizer.start()
+        self._player.start()
+
+    def feed(self, text: str) -> None:
+        self._buffer += text
+        while True:
+            match = SENTENCE_END.search(self._buffer, MIN_SENTENCE_CHARS)
+            if match is None:
+                return
+            self._queue_sentence(self._buffer[: match.start()])
+            self._buffer = self._buffer[match.end():]
+
+    def finish(self) -> None:
+        self._queue_sentence(self._buffer)
+        self._buffer = ""
+        self._sentences.put(None)
+        self._player.join()
+        if self._error is not None:
+            raise self._error
+
+    def _queue_sentence(self, sentence: str) -> None:
+        sentence = " ".join(sentence.split())
+        if any(char.isalnum() for char in sentence):
+            self._sentences.put(sentence)
+
+    def _synthesize(self) -> None:
+        # Sentence N+1 is synthesized here while the player thread is still playing sentence N.
+        while True:
+            sentence = self._sentences.get()
+            if sentence is None:
+                break
+            if self._error is not None:
+                continue
+            try:
+                sample_rate, chunks = self.engine.synthesize_stream(sentence)
+                self._sample_rate = sample_rate
+                for pcm in chunks:
+                    self._audio.put(pcm)
+            except Exception as exc:  # noqa: BLE001
+                self._error = exc
+        self._audio.put(None)
+
+    def _play(self) -> None:
+        sink: AudioSink | None = None
+        try:
+            while True:
+                pcm = self._audio.get()
+                if pcm is None:
+                    break
+                if self._error is not None:
+                    continue
+                try:
+                    if sink is None:
+                        assert self._sample_rate is not None
+                        sink = AudioSink(self._sample_rate)
+                    sink.write(pcm)
+                except Exception as exc:  # noqa: BLE001
+                    self._error = exc
+        finally:
+            if sink is not None:
+                sink.close()
@@ -4,20 +4,30 @@ import threading
 import tkinter as tk
 from tkinter import filedialog, messagebox, scrolledtext
 
-from desktop_app.config import AppConfig
-from desktop_app.intent import detect_intent
+from app.memory_search import memory_prompt
+from desktop_app.config import DEFAULT_SYSTEM_PROMPT, AppConfig
+from desktop_app.intent import REALTIME_KINDS, Intent, detect_intent, is_confirmation, train_intent_classifier
 from desktop_app.memory import MemoryStore
 from desktop_app.pc_control import close_app, control_input, open_app, open_path, set_brightness, set_volume
 from desktop_app.providers import LLMRouter
-from desktop_app.realtime import search_news, search_web, weather
-from desktop_app.speech import SpeechEngine
+from desktop_app.realtime import search_news, search_price, search_web, weather
+from desktop_app.session import SessionMemory, SessionTurn
+from desktop_app.speech import SpeechEngine, Utterance
+from desktop_app.vad import strip_wake_word
 
 
 class JarvisUI:
     def __init__(self, config: AppConfig) -> None:
         self.config = config
         self.router = LLMRouter(config)
-        self.memory = MemoryStore(root_path="jarvis_memory")
+        self.memory = MemoryStore(
+            root_path="jarvis_memory",
+            session=SessionMemory(
+                max_turns=config.session_max_turns,
+                max_tokens=config.session_max_tokens,
+                summarizer=self._summarize_session,
+            ),
+        )
         self.speech = SpeechEngine(config)
         self.root = tk.Tk()
         self.root.title("Jarvis Desktop Assistant")
@@ -101,54 +111,179 @@ class JarvisUI:
         )
         tk.Button(auto_speak_row, text="Save Settings", command=self.save_settings).pack(side=tk.LEFT, padx=8)
 
+        # Message state is only touched on the Tk thread; workers hand results back with root.after.
+        self._busy = 0
+        self._pending_command: str | None = None
+        # One capture stream at a time: a manual recording stops the wake-word capture and holds the
+        # microphone until it is done.
+        self._microphone = threading.Condition()
+        self._manual_voice = threading.Event()
+        if self.config.voice_wake_word:
+            threading.Thread(target=self._listen_for_wake_word, name="wake-word", daemon=True).start()
+        self._start_intent_training()
+
     def select_memory_folder(self) -> None:
         folder = filedialog.askdirectory()
         if folder:
             self.memory.set_root(folder)
             messagebox.showinfo("Memory", f"Memory folder set to {folder}")
+            self._start_intent_training()
 
     def on_send(self) -> None:
         text = self.entry.get().strip()
         if not text:
             return
         self.entry.delete(0, tk.END)
-        self._append_chat("You", text)
-        self.memory.add_session("user", text)
-        threading.Thread(target=self._handle_message, args=(text,), daemon=True).start()
+        self._submit(text)
 
     def on_voice(self) -> None:
+        if self._manual_voice.is_set():
+            return
+        self._manual_voice.set()
         threading.Thread(target=self._handle_voice, daemon=True).start()
 
     def _handle_voice(self) -> None:
         try:
             self._append_chat("System", "Listening...")
-            self.speech.record_audio("voice_input.wav")
-            text = self.speech.transcribe("voice_input.wav")
+            with self._microphone:
+                text = self.speech.listen(start_timeout=self.config.voice_record_seconds)
             if not text:
                 self._append_chat("System", "I didn't catch that. Try again.")
                 return
-            self._append_chat("You", text)
-            self.memory.add_session("user", text)
-            self._handle_message(text)
+            self.root.after(0, self._submit, text)
         except Exception as exc:  # noqa: BLE001
             self._append_chat("System", f"Voice error: {exc}")
+        finally:
+            with self._microphone:
+                self._manual_voice.clear()
+                self._microphone.notify_all()
+
+    def _listen_for_wake_word(self) -> None:
+        while True:
+            try:
+                with self._microphone:
+                    self._microphone.wait_for(lambda: not self._manual_voice.is_set())
+                    heard = self.speech.listen(stop=self._manual_voice)
+            except Exception as exc:  # noqa: BLE001
+                self._append_chat("System", f"Voice error: {exc}")
+                return
+            if heard and not self._manual_voice.is_set():
+                self.root.after(0, self._on_wake_word, heard)
+
+    def _on_wake_word(self, heard: str) -> None:
+        if self._busy:
+            return
+        text = strip_wake_word(heard, self.config.voice_wake_word)
+        if text is None:
+            return
+        if not text:
+            self._append_chat("System", "Yes?")
+            return
+        self._submit(text)
 
-    def _handle_message(self, text: str) -> None:
-        intent = detect_intent(text)
+    def _submit(self, text: str) -> None:
+        self._append_chat("You", text)
+        self.memory.add_session("user", text)
+        self._busy += 1
+        pending, self._pending_command = self._pending_command, None
+        threading.Thread(target=self._handle_message, args=(text, pending), daemon=True).start()
+
+    def _handle_message(self, text: str, pending: str | None) -> None:
+        pending_command = None
+        try:
+            pending_command = self._respond(text, pending)
+        finally:
+            self.root.after(0, self._finish_message, pending_command)
+
+    def _finish_message(self, pending_command: str | None) -> None:
+        self._busy -= 1
+        if pending_command is not None:
+            self._pending_command = pending_command
+
+    def _respond(self, text: str, pending: str | None) -> str | None:
+        if pending and is_confirmation(text):
+            intent = Intent(kind="pc_control", payload=pending)
+        else:
+            intent = detect_intent(text)
         if intent.kind == "pc_control":
-            response = self._handle_pc_control(text)
+            response = self._handle_pc_control(intent.payload)
+        elif intent.kind == "confirm":
+            response = f'Did you mean "{intent.payload}"? Say yes to run it.'
         elif intent.kind == "web_search":
-            response = self._handle_search(text)
-        elif intent.kind == "realtime":
-            response = self._handle_realtime(text)
-        elif intent.kind == "writing":
-            response = self.router.generate(text, need_reasoning=False)
+            response = self._handle_search(intent)
+        elif intent.kind in REALTIME_KINDS:
+            response = self._handle_realtime(intent)
         else:
-            response = self.router.generate(text, need_reasoning=True)
+            utterance = self._open_utterance()
+            try:
+                response = self._stream_reply(text, need_reasoning=intent.kind != "writing", utterance=utterance)
+                self.memory.add_session("assistant", response)
+                self._maybe_store_memory(text, response)
+            finally:
+                self._finish_utterance(utterance)
+            return None
         self.memory.add_session("assistant", response)
         self._append_chat("Assistant", response)
         self._maybe_store_memory(text, response)
         self._maybe_speak(response)
+        return intent.payload if intent.kind == "confirm" else None
+
+    def _stream_reply(self, text: str, need_reasoning: bool, utterance: Utterance | None = None) -> str:
+        chunks: list[str] = []
+        self._append_chat_chunk("Assistant: ")
+        try:
+            for chunk in self.router.stream(
+                text,
+                need_reasoning=need_reasoning,
+                system_prompt=self._system_prompt(text),
+                history=self._history(text),
+            ):
+                chunks.append(chunk)
+                self._append_chat_chunk(chunk)
+                if utterance is not None:
+                    utterance.feed(chunk)
+        finally:
+            self._append_chat_chunk("\n")
+        return "".join(chunks)
+
+    def _start_intent_training(self) -> None:
+        threading.Thread(target=self._train_intents, name="intent-training", daemon=True).start()
+
+    def _train_intents(self) -> None:
+        try:
+            commands = [item.content for item in self.memory.fetch_long_term(["command"], limit=5000)]
+            train_intent_classifier(commands)
+        except Exception:  # noqa: BLE001
+            pass
+
+    def _summarize_session(self, summary: str, turns: list[SessionTurn]) -> str:
+        transcript = "\n".join(f"{turn.role}: {turn.content}" for turn in turns)
+        prompt = (
+            "Update the running summary of this conversation with the new turns. "
+            "Keep names, preferences, decisions and open tasks; answer with the summary only, "
+            "in at most 120 words.\n\n"
+            f"Current summary:\n{summary or '(empty)'}\n\nNew turns:\n{transcript}"
+        )
+        return self.router.generate(prompt, system_prompt="You write short, factual conversation summaries.")
+
+    def _system_prompt(self, text: str) -> str | None:
+        try:
+            memories = self.memory.search(text, limit=self.config.memory_context_k)
+        except Exception:  # noqa: BLE001
+            memories = []
+        summary = self.memory.session_memory.summary
+        if not memories and not summary:
+            return None
+        prompt = DEFAULT_SYSTEM_PROMPT
+        if summary:
+            prompt = f"{prompt}\nEarlier in this conversation: {summary}"
+        return memory_prompt(prompt, [f"{item.role}: {item.content}" for item in memories])
+
+    def _history(self, text: str) -> list[dict[str, str]]:
+        turns = self.memory.session_memory.window(self.config.llm_context_budget)
+        if turns and turns[-1].role == "user" and turns[-1].content == text:
+            turns = turns[:-1]
+        return [{"role": turn.role, "content": turn.content} for turn in turns]
 
     def _handle_pc_control(self, text: str) -> str:
         lowered = text.lower()
@@ -179,31 +314,27 @@ class JarvisUI:
             return "Please provide click coordinates like: click 120 300."
         return "Please specify an action like open, close, volume, brightness, type, press, or click."
 
-    def _handle_search(self, text: str) -> str:
-        query = text.split("search", 1)[-1].strip() if "search" in text.lower() else text
-        results = search_web(query)
+    def _handle_search(self, intent: Intent) -> str:
+        results = search_web(intent.slots.get("query") or intent.payload)
         answer = results.get("answer") or results.get("abstract") or "No summary available."
         return f"Search: {answer}"
 
-    def _handle_realtime(self, text: str) -> str:
-        lowered = text.lower()
-        if "weather" in lowered:
-            coords = [item for item in lowered.replace("weather", "").split() if self._is_number(item)]
-            if len(coords) >= 2:
-                data = weather(float(coords[0]), float(coords[1]))
+    def _handle_realtime(self, intent: Intent) -> str:
+        if intent.kind == "weather":
+            coords = intent.slots.get("coordinates")
+            if coords:
+                data = weather(coords[0], coords[1])
                 current = data.get("current_weather", {})
                 temp = current.get("temperature")
                 wind = current.get("windspeed")
                 return f"Weather: {temp}°C, wind {wind} km/h."
             return "Share your city or provide coordinates like: weather 28.6 77.2"
-        if "news" in lowered:
-            query = lowered.replace("news", "").strip() or "latest"
-            results = search_news(query)
+        if intent.kind == "news":
+            results = search_news(intent.slots.get("topic") or "latest")
             summary = results.get("abstract") or "No summary available."
             return f"News: {summary}"
-        if "price" in lowered or "stock" in lowered:
-            query = lowered.replace("price", "").replace("stock", "").strip()
-            results = search_web(f"{query} price")
+        if intent.kind == "price":
+            results = search_price(intent.slots.get("topic", ""))
             answer = results.get("answer") or results.get("abstract") or "No summary available."
             return f"Price: {answer}"
         return "Tell me what real-time info you need (news, weather, price)."
@@ -218,10 +349,22 @@ class JarvisUI:
             self.memory.remember_style(user_text)
 
     def _maybe_speak(self, response: str) -> None:
+        utterance = self._open_utterance()
+        if utterance is None:
+            return
+        utterance.feed(response)
+        self._finish_utterance(utterance)
+
+    def _open_utterance(self) -> Utterance | None:
         if not self.config.auto_speak:
+            return None
+        return self.speech.open_utterance()
+
+    def _finish_utterance(self, utterance: Utterance | None) -> None:
+        if utterance is None:
             return
         try:
-            self.speech.speak(response)
+            utterance.finish()
         except Exception:  # noqa: BLE001
             return
 
@@ -245,13 +388,6 @@ class JarvisUI:
             return None
         return int(parts[0])
 
-    def _is_number(self, value: str) -> bool:
-        try:
-            float(value)
-        except ValueError:
-            return False
-        return True
-
     def _append_chat(self, role: str, message: str) -> None:
         def _insert() -> None:
             self.chat_log.insert(tk.END, f"{role}: {message}\n")
@@ -259,5 +395,12 @@ class JarvisUI:
 
         self.root.after(0, _insert)
 
+    def _append_chat_chunk(self, chunk: str) -> None:
+        def _insert() -> None:
+            self.chat_log.insert(tk.END, chunk)
+            self.chat_log.see(tk.END)
+
+        self.root.after(0, _insert)
+
     def run(self) -> None:
         self.root.mainloop()
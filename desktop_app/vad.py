@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+from collections import deque
+from typing import Any, Iterator
+import queue
+import re
+import threading
+
+from desktop_app.providers import is_module_available, load_module
+
+np = None
+if is_module_available("numpy"):
+    import numpy as np  # type: ignore
+
+WEBRTC_RATES = (8000, 16000, 32000, 48000)
+
+
+class EnergyVAD:
+    def __init__(self, ratio: float = 3.0, min_energy: float = 0.01, adapt: float = 0.05) -> None:
+        self.ratio = ratio
+        self.min_energy = min_energy
+        self.adapt = adapt
+        self._noise_floor: float | None = None
+
+    def is_speech(self, frame: Any) -> bool:
+        energy = float(np.sqrt(np.mean(np.square(frame)))) if len(frame) else 0.0
+        if self._noise_floor is None:
+            self._noise_floor = energy
+        speech = energy > max(self.min_energy, self._noise_floor * self.ratio)
+        if not speech:
+            self._noise_floor += self.adapt * (energy - self._noise_floor)
+        return speech
+
+
+class WebRtcVAD:
+    def __init__(self, sample_rate: int, aggressiveness: int = 2) -> None:
+        webrtcvad = load_module("webrtcvad")
+        self.sample_rate = sample_rate
+        self._vad = webrtcvad.Vad(aggressiveness)
+
+    def is_speech(self, frame: Any) -> bool:
+        pcm = (np.clip(frame, -1.0, 1.0) * 32767).astype("<i2").tobytes()
+        return bool(self._vad.is_speech(pcm, self.sample_rate))
+
+
+def create_vad(sample_rate: int, mode: str = "auto") -> EnergyVAD | WebRtcVAD:
+    if mode == "energy" or sample_rate not in WEBRTC_RATES:
+        return EnergyVAD()
+    if mode == "webrtc" or is_module_available("webrtcvad"):
+        return WebRtcVAD(sample_rate)
+    return EnergyVAD()
+
+
+def strip_wake_word(text: str, wake_word: str) -> str | None:
+    words = re.sub(r"[^\w\s]", " ", text.lower()).split()
+    wake = re.sub(r"[^\w\s]", " ", wake_word.lower()).split()
+    for start in range(min(len(words), 3)):
+        if words[start:start + len(wake)] == wake:
+            remainder = text.split()[start + len(wake):]
+            return " ".join(remainder).strip(" ,.!?")
+    return None
+
+
+class VoiceCapture:
+    def __init__(
+        self,
+        sample_rate: int = 16000,
+        vad_mode: str = "auto",
+        frame_ms: int = 30,
+        pre_roll: float = 0.3,
+        silence: float = 0.8,
+        segment_pause: float = 0.25,
+        segment_seconds: float = 10.0,
+        max_seconds: float = 30.0,
+        start_timeout: float | None = 8.0,
+    ) -> None:
+        self.sample_rate = sample_rate
+        self.vad = create_vad(sample_rate, vad_mode)
+        self.frame_size = sample_rate * frame_ms // 1000
+        self.frame_seconds = frame_ms / 1000
+        self.pre_roll_frames = max(1, int(pre_roll / self.frame_seconds))
+        self.silence_frames = max(1, int(silence / self.frame_seconds))
+        self.segment_pause_frames = max(1, int(segment_pause / self.frame_seconds))
+        self.segment_frames = int(segment_seconds / self.frame_seconds)
+        self.max_frames = int(max_seconds / self.frame_seconds)
+        self.start_timeout = start_timeout
+
+    def segments(self, stop: threading.Event | None = None) -> Iterator[Any]:
+        if not is_module_available("sounddevice"):
+            raise RuntimeError("sounddevice is required for voice recording")
+        sounddevice = load_module("sounddevice")
+        frames: queue.Queue[Any] = queue.Queue()
+
+        def _on_audio(indata: Any, _frames: int, _time: Any, _status: Any) -> None:
+            frames.put(indata[:, 0].copy())
+
+        with sounddevice.InputStream(
+            samplerate=self.sample_rate,
+            channels=1,
+            dtype="float32",
+            blocksize=self.frame_size,
+            callback=_on_audio,
+        ):
+            yield from self._segments(frames, stop)
+
+    def _segments(self, frames: queue.Queue[Any], stop: threading.Event | None = None) -> Iterator[Any]:
+        # The ring buffer keeps the audio just before speech starts so the first syllable is not
+        # clipped; after that, frames are collected until the trailing silence ends the utterance.
+        # Setting stop drops whatever has not been yielded yet and releases the input stream.
+        ring: deque[Any] = deque(maxlen=self.pre_roll_frames)
+        waited = 0
+        while True:
+            frame = frames.get()
+            if stop is not None and stop.is_set():
+                return
+            if self.vad.is_speech(frame):
+                break
+            ring.append(frame)
+            waited += 1
+            if self.start_timeout is not None and waited * self.frame_seconds >= self.start_timeout:
+                return
+        segment = [*ring, frame]
+        total = 1
+        silent = 0
+        while total < self.max_frames:
+            frame = frames.get()
+            if stop is not None and stop.is_set():
+                return
+            segment.append(frame)
+            total += 1
+            silent = 0 if self.vad.is_speech(frame) else silent + 1
+            if silent >= self.silence_frames:
+                break
+            if len(segment) >= self.segment_frames and silent >= self.segment_pause_frames:
+                yield np.concatenate(segment)
+                segment = []
+        if segment and len(segment) > silent:
+            yield np.concatenate(segment[: len(segment) - silent])
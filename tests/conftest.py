@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+from typing import Any
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class SlowClient:
+    # Stands in for the shared async HTTP client; every GET takes a moment and returns `payload`.
+    def __init__(self, payload: dict[str, Any]) -> None:
+        self.payload = payload
+        self.calls = 0
+
+    async def get(self, url: str, params: dict[str, Any]) -> SlowClient:
+        self.calls += 1
+        await asyncio.sleep(0.05)
+        return self
+
+    def raise_for_status(self) -> None:
+        pass
+
+    def json(self) -> dict[str, Any]:
+        return self.payload
+
+
+async def cancel_first(first: asyncio.Future[Any], second: asyncio.Future[Any]) -> Any:
+    await asyncio.sleep(0.01)
+    first.cancel()
+    result = await asyncio.wait_for(second, timeout=2)
+    await asyncio.sleep(0.01)
+    return result
@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from app.main import read_audio_upload
+
+
+def request(content_type: str, body: bytes) -> Request:
+    async def receive() -> dict[str, object]:
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    scope = {"type": "http", "method": "POST", "path": "/", "headers": [(b"content-type", content_type.encode())]}
+    return Request(scope, receive)
+
+
+def test_raw_and_base64_audio_are_read() -> None:
+    assert asyncio.run(read_audio_upload(request("audio/wav", b"RIFF"))) == b"RIFF"
+    assert asyncio.run(read_audio_upload(request("application/json", b'{"audio_base64": "UklGRg=="}'))) == b"RIFF"
+
+
+@pytest.mark.skipif(
+    importlib.util.find_spec("python_multipart") is not None or importlib.util.find_spec("multipart") is not None,
+    reason="python-multipart is installed",
+)
+def test_multipart_without_python_multipart_is_415() -> None:
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(read_audio_upload(request("multipart/form-data; boundary=x", b"")))
+    assert exc.value.status_code == 415
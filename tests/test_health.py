@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import pytest
+
+from app.health import CLOSED, HALF_OPEN, OPEN, ProviderHealth
+from app.llm import LLMRouter
+
+
+def trip(health: ProviderHealth, provider: str) -> None:
+    for _ in range(health.failure_threshold):
+        health.record_failure(provider)
+
+
+def test_order_does_not_claim_the_half_open_trial() -> None:
+    health = ProviderHealth(failure_threshold=1, reset_timeout=0.0, adaptive=False)
+    trip(health, "ollama")
+    assert health.order(["ollama", "gemini"]) == ["ollama", "gemini"]
+    assert health.order(["ollama", "gemini"]) == ["ollama", "gemini"]
+    assert health.snapshot()["ollama"]["state"] == OPEN
+
+    assert health.acquire("ollama", ["ollama", "gemini"])
+    assert health.snapshot()["ollama"]["state"] == HALF_OPEN
+    health.record_success("ollama")
+    assert health.snapshot()["ollama"]["state"] == CLOSED
+
+
+def test_open_breakers_are_skipped_unless_all_are_open() -> None:
+    health = ProviderHealth(failure_threshold=1, reset_timeout=60.0, adaptive=False)
+    trip(health, "ollama")
+    assert health.order(["ollama", "gemini"]) == ["gemini"]
+    assert not health.acquire("ollama", ["ollama", "gemini"])
+    trip(health, "gemini")
+    assert health.order(["ollama", "gemini"]) == ["ollama", "gemini"]
+    assert health.acquire("ollama", ["ollama", "gemini"])
+
+
+def test_released_trial_can_be_claimed_again() -> None:
+    health = ProviderHealth(failure_threshold=1, reset_timeout=60.0, adaptive=False)
+    trip(health, "ollama")
+    health._breakers["ollama"].changed_at -= 60.0
+    assert health.acquire("ollama", ["ollama", "gemini"])
+    assert not health.acquire("ollama", ["ollama", "gemini"])
+    health.release("ollama")
+    assert health.snapshot()["ollama"]["state"] == OPEN
+    assert health.acquire("ollama", ["ollama", "gemini"])
+
+
+@pytest.mark.parametrize("mode", ["off", "race"])
+def test_empty_reply_does_not_hold_the_half_open_trial(mode: str, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("LLM_RACE_MODE", mode)
+    router = LLMRouter()
+    router.health = ProviderHealth(failure_threshold=1, reset_timeout=60.0, adaptive=False)
+    monkeypatch.setattr(router, "select_provider_chain", lambda need_reasoning, need_realtime: ["ollama", "gemini"])
+    router._try_ollama = lambda prompt, **options: None  # type: ignore[method-assign]
+    router._try_gemini = lambda prompt, **options: "ok"  # type: ignore[method-assign]
+    trip(router.health, "ollama")
+    router.health._breakers["ollama"].changed_at -= 60.0
+
+    assert router.generate("hi", use_cache=False) == "ok"
+    assert router.health.snapshot()["ollama"]["state"] == OPEN
+    assert router.health.acquire("ollama", ["ollama", "gemini"])
@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+import pytest
+
+import app.intent_classifier as intent_classifier
+from desktop_app.intent import detect_intent, is_confirmation
+
+
+@pytest.fixture
+def seed_classifier(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("INTENT_CLASSIFIER", "1")
+    monkeypatch.delenv("INTENT_MODEL", raising=False)
+    monkeypatch.setattr(intent_classifier, "_classifier", None)
+
+
+def test_classifier_is_opt_in(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv("INTENT_CLASSIFIER", raising=False)
+    monkeypatch.delenv("INTENT_MODEL", raising=False)
+    assert intent_classifier.get_intent_classifier() is None
+
+
+def test_guessed_app_launch_needs_confirmation(seed_classifier: None) -> None:
+    intent = detect_intent("launch discord")
+    assert intent.kind == "confirm"
+    assert intent.payload == "open discord"
+    assert is_confirmation("Go ahead!")
+    assert not is_confirmation("no thanks")
+
+
+def test_weather_guess_without_coordinates_goes_to_llm(seed_classifier: None) -> None:
+    assert detect_intent("is it raining outside").kind == "general"
@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+from app.intents import IntentEngine
+
+
+def test_keywords_keep_substring_routing() -> None:
+    engine = IntentEngine()
+    assert engine.classify("do some research on cats").kind == "web_search"
+    assert engine.classify("researching poems").kind == "web_search"
+    assert engine.classify("please open the door") is None
+    assert engine.classify("Open Notepad").slots == {"query": "Notepad"}
+
+
+def test_topic_strips_whole_keywords_only() -> None:
+    engine = IntentEngine()
+    assert engine.classify("livestock prices").slots == {"topic": "livestock"}
+    assert engine.classify("stock price of apple?").slots == {"topic": "apple"}
+    assert engine.classify("latest cricket news").slots == {"topic": "latest cricket"}
+
+
+def test_kinds_restrict_rules_and_results_are_cached() -> None:
+    engine = IntentEngine()
+    assert engine.classify("search the weather", kinds=("weather",)).kind == "weather"
+    assert engine.classify("volume 30", kinds={"pc_control"}).slots == {"numbers": [30.0]}
+    assert engine.classify("show stats") is engine.classify("show stats")
+    assert IntentEngine(cache_size=0).classify("show stats") is not None
+
+
+def test_higher_priority_keywords_win_even_when_they_overlap() -> None:
+    engine = IntentEngine(cache_size=0)
+    assert engine.classify("newsearch").kind == "web_search"
+    assert engine.classify("latest news on the stock price").kind == "news"
+    assert engine.classify("the weather, then find it").kind == "weather"
+    assert engine.classify("find the weather").slots == {"query": "the weather"}
+    assert engine.classify("volume up", kinds={"weather"}) is None
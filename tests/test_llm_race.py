@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from app.cache import ResponseCache
+from app.health import ProviderHealth
+from app.llm import LLMRouter
+
+
+@pytest.fixture
+def router(monkeypatch: pytest.MonkeyPatch) -> LLMRouter:
+    monkeypatch.setenv("LLM_PROVIDER", "auto")
+    monkeypatch.setenv("LLM_RACE_WIDTH", "2")
+    router = LLMRouter()
+    router.health = ProviderHealth()
+    monkeypatch.setattr(router, "select_provider_chain", lambda need_reasoning, need_realtime: ["ollama", "gemini"])
+    return router
+
+
+@pytest.mark.parametrize("mode", ["race", "hedge"])
+def test_sync_race_passes_options_to_providers(router: LLMRouter, mode: str, monkeypatch: pytest.MonkeyPatch) -> None:
+    router.race_mode = mode
+    if mode == "hedge":
+        monkeypatch.setattr(router, "_hedge_delay", lambda provider: 0.05)
+    calls = []
+
+    def slow(prompt: str, *, system_prompt: str | None = None, history: list | None = None) -> str:
+        calls.append(("ollama", system_prompt, history))
+        time.sleep(0.5)
+        return "slow"
+
+    def fast(prompt: str, *, system_prompt: str | None = None, history: list | None = None) -> str:
+        calls.append(("gemini", system_prompt, history))
+        return f"fast:{prompt}"
+
+    router._try_ollama = slow  # type: ignore[method-assign]
+    router._try_gemini = fast  # type: ignore[method-assign]
+    history = [{"role": "user", "content": "earlier"}]
+    reply = router.generate("hi", system_prompt="be brief", history=history, use_cache=False)
+    assert reply == "fast:hi"
+    assert ("gemini", "be brief", history) in calls
+
+
+def test_sync_race_falls_back_when_first_provider_fails(router: LLMRouter) -> None:
+    router.race_mode = "hedge"
+
+    def broken(prompt: str, **options: object) -> str:
+        raise RuntimeError("down")
+
+    router._try_ollama = broken  # type: ignore[method-assign]
+    router._try_gemini = lambda prompt, **options: "ok"  # type: ignore[method-assign]
+    assert router.generate("hi", use_cache=False) == "ok"
+
+
+def test_hedge_delay_follows_the_provider_that_took_over(router: LLMRouter, monkeypatch: pytest.MonkeyPatch) -> None:
+    router.race_mode = "hedge"
+    chain = ["ollama", "gemini", "openrouter"]
+    monkeypatch.setattr(router, "select_provider_chain", lambda need_reasoning, need_realtime: chain)
+    delays = []
+
+    def delay(provider: str) -> float:
+        delays.append(provider)
+        return 0.05
+
+    def broken(prompt: str, **options: object) -> str:
+        raise RuntimeError("down")
+
+    def slow(prompt: str, **options: object) -> str:
+        time.sleep(0.3)
+        return "slow"
+
+    monkeypatch.setattr(router, "_hedge_delay", delay)
+    router._try_ollama = broken  # type: ignore[method-assign]
+    router._try_gemini = slow  # type: ignore[method-assign]
+    router._try_openrouter = lambda prompt, **options: "fast"  # type: ignore[method-assign]
+    assert router.generate("hi", use_cache=False) == "fast"
+    assert delays[0] == "ollama"
+    assert delays[-1] == "gemini"
+
+
+def test_async_cache_tiers_run_off_the_event_loop(router: LLMRouter, tmp_path: Path) -> None:
+    router.cache = ResponseCache(db_path=str(tmp_path / "cache.db"))
+    router.semantic_cache = None
+    threads = []
+    cached_reply, store_reply = router._cached_reply, router._store_reply
+
+    def tracked(method):
+        def call(*args):
+            threads.append(threading.get_ident())
+            return method(*args)
+
+        return call
+
+    async def reply(prompt: str, **options) -> str:
+        return "ok"
+
+    router._cached_reply = tracked(cached_reply)  # type: ignore[method-assign]
+    router._store_reply = tracked(store_reply)  # type: ignore[method-assign]
+    router._atry_ollama = reply  # type: ignore[method-assign]
+    router.race_mode = "off"
+
+    async def run() -> tuple[str, str]:
+        return await router.agenerate("hi"), await router.agenerate("hi")
+
+    assert asyncio.run(run()) == ("ok", "ok")
+    assert len(threads) == 3
+    assert threading.get_ident() not in threads
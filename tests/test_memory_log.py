@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from pathlib import Path
+
+import pytest
+
+import app.memory_log as memory_log
+import app.memory_search as memory_search
+from app.memory_log import MemoryLog
+
+
+def test_unknown_role_pages_are_full(tmp_path: Path) -> None:
+    log = MemoryLog(str(tmp_path))
+    log.append([{"role": "tool" if i % 3 == 0 else "note", "content": str(i), "timestamp": 1000 + i} for i in range(30)])
+
+    first = log.page(limit=4, role="tool")
+    assert [entry["content"] for entry in first["entries"]] == ["18", "21", "24", "27"]
+    second = log.page(limit=4, role="tool", before=first["next_cursor"])
+    assert [entry["content"] for entry in second["entries"]] == ["6", "9", "12", "15"]
+    assert [entry["content"] for entry in log.page(limit=2, role="note")["entries"]] == ["28", "29"]
+
+
+def test_open_logs_are_bounded_and_keyed_by_normalized_path(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("MEMORY_MAX_OPEN_ROOTS", "2")
+    monkeypatch.setattr(memory_log, "_logs", OrderedDict())
+    first = memory_log.get_memory_log(str(tmp_path / "a"))
+    first.append([{"role": "user", "content": "hi", "timestamp": 1}])
+    assert memory_log.get_memory_log(f"{tmp_path}/b/../a/") is first
+
+    memory_log.get_memory_log(str(tmp_path / "b"))
+    memory_log.get_memory_log(str(tmp_path / "c"))
+    assert len(memory_log._logs) == 2
+    assert first._log is None
+    assert first.page()["entries"][0]["content"] == "hi"
+
+
+def test_open_search_indexes_are_bounded(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("MEMORY_MAX_OPEN_ROOTS", "1")
+    monkeypatch.setattr(memory_search, "_indexes", OrderedDict())
+    first = memory_search.get_memory_search_index(str(tmp_path / "a"))
+    memory_search.get_memory_search_index(str(tmp_path / "b"))
+    assert list(memory_search._indexes) == [memory_log.normalize_root(str(tmp_path / "b"))]
+    assert first.max_id == -1
@@ -0,0 +1,21 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from app.memory_writer import MemoryWriter
+
+
+def test_recent_includes_queued_entries_without_flushing(tmp_path: Path) -> None:
+    writer = MemoryWriter(batch_size=1000, interval=60.0)
+    root = str(tmp_path)
+    writer.write(root, [{"role": "user", "message": "one"}])
+    writer.flush()
+    writer.write(root, [{"role": "assistant", "message": "two"}, {"role": "user", "message": "three"}])
+
+    assert [entry["message"] for entry in writer.recent(root, 10)] == ["one", "two", "three"]
+    assert [entry["message"] for entry in writer.recent(root, 2)] == ["two", "three"]
+    assert writer.stats()["flushes"] == 1
+
+    writer.flush()
+    assert [entry["message"] for entry in writer.recent(f"{root}/", 10)] == ["one", "two", "three"]
+    writer.close()
@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any
+
+import pytest
+
+import app.search_service as search_service
+from conftest import SlowClient, cancel_first
+
+
+def test_cancelled_caller_does_not_cancel_coalesced_waiters(monkeypatch: pytest.MonkeyPatch) -> None:
+    client = SlowClient({"Heading": "Python", "RelatedTopics": []})
+    monkeypatch.setattr(search_service, "get_async_http_client", lambda: client)
+    service = search_service.SearchService()
+
+    async def run() -> Any:
+        first = asyncio.ensure_future(service.asearch("python"))
+        second = asyncio.ensure_future(service.asearch("Python?"))
+        return await cancel_first(first, second)
+
+    assert asyncio.run(run())["heading"] == "Python"
+    assert client.calls == 1
+    assert service.stats()["errors"] == 0
+    assert service.stats()["entries"] == 1
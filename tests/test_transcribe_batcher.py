@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+import asyncio
+import sys
+import types
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+import pytest
+
+from app.transcribe_batcher import TranscriptionBatcher
+
+
+class FakePool:
+    @contextmanager
+    def acquire(self) -> Iterator[object]:
+        yield object()
+
+
+@pytest.fixture
+def batcher(monkeypatch: pytest.MonkeyPatch) -> TranscriptionBatcher:
+    monkeypatch.setitem(sys.modules, "whisper", types.ModuleType("whisper"))
+    batcher = TranscriptionBatcher(FakePool(), max_batch_size=4, max_wait=0.2)  # type: ignore[arg-type]
+    monkeypatch.setattr(batcher, "_decode", lambda whisper, model, audios: ([f"text {audio}" for audio in audios], 0))
+    return batcher
+
+
+def test_cancelled_request_does_not_break_the_batch(batcher: TranscriptionBatcher) -> None:
+    async def run() -> tuple[Any, ...]:
+        gone = asyncio.ensure_future(batcher.transcribe(1))
+        kept = asyncio.ensure_future(batcher.transcribe(2))
+        await asyncio.sleep(0.01)
+        gone.cancel()
+        first = await asyncio.wait_for(asyncio.gather(gone, kept, return_exceptions=True), timeout=2)
+        second = await asyncio.wait_for(batcher.transcribe(3), timeout=2)
+        return first, second
+
+    (gone, kept), later = asyncio.run(run())
+    assert isinstance(gone, asyncio.CancelledError)
+    assert kept == "text 2"
+    assert later == "text 3"
+    assert batcher._thread is not None and batcher._thread.is_alive()
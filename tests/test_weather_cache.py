@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any
+
+import pytest
+
+import app.weather_cache as weather_cache
+from conftest import SlowClient, cancel_first
+
+
+def test_cancelled_caller_does_not_cancel_coalesced_waiters(monkeypatch: pytest.MonkeyPatch) -> None:
+    client = SlowClient({"current_weather": {"temperature": 21.0}})
+    monkeypatch.setattr(weather_cache, "get_async_http_client", lambda: client)
+    cache = weather_cache.WeatherCache()
+
+    async def run() -> Any:
+        first = asyncio.ensure_future(cache.aget(28.6, 77.2))
+        second = asyncio.ensure_future(cache.aget(28.6, 77.2))
+        return await cancel_first(first, second)
+
+    assert asyncio.run(run())["current_weather"]["temperature"] == 21.0
+    assert client.calls == 1
+    assert cache.stats()["errors"] == 0
+    assert cache.stats()["cells"] == 1